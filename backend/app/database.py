@@ -1,5 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -9,16 +10,98 @@ load_dotenv()
 # Use SQLite for simplicity, can be changed to PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./news.db")
 
+# Connection pool settings (pool size / overflow apply to server databases only)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its asyncio driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+def is_sqlite_file(url: str) -> bool:
+    """True for on-disk SQLite databases (the tuned profile doesn't apply to :memory:)"""
+    return url.startswith("sqlite") and ":memory:" not in url and url.split("://", 1)[1] not in ("", "/")
+
+# SQLite performance profile - applied on every new connection to a file database
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # Readers never wait on the extraction writer
+    "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # Negative = KiB (64 MiB)
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", "268435456"),  # 256 MiB
+    "temp_store": "MEMORY"
+}
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def _on_connect(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection, SQLITE_PRAGMAS)
+
+def _on_read_connect(dbapi_connection, connection_record):
+    # journal_mode is already persisted in the file by the writer engine
+    pragmas = {k: v for k, v in SQLITE_PRAGMAS.items() if k != "journal_mode"}
+    pragmas["query_only"] = "ON"
+    apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+# Optional read replica for PostgreSQL; SQLite reads use a separate read-only engine on the same file
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", DATABASE_URL)
+
 if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
-    )
+    engine_options = {"connect_args": {"check_same_thread": False}, "pool_pre_ping": DB_POOL_PRE_PING}
+    if is_sqlite_file(DATABASE_URL):
+        engine_options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    async_engine_options = {"pool_pre_ping": DB_POOL_PRE_PING}
 else:
-    engine = create_engine(DATABASE_URL)
+    engine_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+    async_engine_options = dict(engine_options)
+
+engine = create_engine(DATABASE_URL, **engine_options)
+async_engine = create_async_engine(get_async_database_url(DATABASE_URL), **async_engine_options)
+
+if is_sqlite_file(DATABASE_URL):
+    event.listen(engine, "connect", _on_connect)
+    event.listen(async_engine.sync_engine, "connect", _on_connect)
+    read_engine = create_engine(DATABASE_URL, **engine_options)
+    event.listen(read_engine, "connect", _on_read_connect)
+elif DATABASE_READ_URL != DATABASE_URL:
+    read_engine = create_engine(DATABASE_READ_URL, **engine_options)
+else:
+    read_engine = engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+def init_db():
+    """Create missing tables, plus indexes added to tables that already exist"""
+    from app.services.search_index import ensure_search_index
+    from app.services.near_duplicates import migrate_legacy_clusters
+    from app.services.response_cache import ensure_data_version
+    
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    ensure_search_index(engine)
+    migrate_legacy_clusters(engine)
+    ensure_data_version(engine)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -26,3 +109,16 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Read-only session for GET routes - served by the reader pool / replica"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Async session for `async def` routes so queries don't block the event loop"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
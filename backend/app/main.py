@@ -1,16 +1,57 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.routers import news, highlights, chat
-from app.database import engine, Base
+from app.database import async_engine, init_db
+from app.services import embedding_model
+from app.services.job_scheduler import get_job_scheduler
+from app.services.content_enricher import get_content_enricher, CONTENT_ENRICHMENT_ENABLED
+from app.services.content_parser import shutdown_parse_pool
+from app.services.embedding_worker import get_embedding_worker
+from app.services.extraction_pipeline import EMBEDDINGS_ENABLED
+from app.services.http_client import start_http_session, close_http_session
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and indexes
+init_db()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Optionally load the shared embedding model before serving the first chat request
+    if embedding_model.EMBEDDING_WARMUP:
+        try:
+            await asyncio.to_thread(embedding_model.warm_up)
+        except Exception as e:
+            print(f"Embedding model warm-up failed: {e}")
+    
+    # Shared HTTP client so connections and DNS lookups are reused across extraction runs
+    await start_http_session()
+    
+    # Embed articles stored without a vector (earlier runs, queue lost on restart)
+    if EMBEDDINGS_ENABLED:
+        get_embedding_worker().start()
+    
+    # Background extraction jobs (and periodic runs from EXTRACTION_SCHEDULE)
+    scheduler = get_job_scheduler()
+    await scheduler.start()
+    
+    # Full-page content enrichment for stored articles
+    enricher = get_content_enricher()
+    if CONTENT_ENRICHMENT_ENABLED:
+        await enricher.start()
+    yield
+    await enricher.stop()
+    await scheduler.stop()
+    shutdown_parse_pool()
+    await close_http_session()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="AI News Aggregation API",
     description="AI-powered news aggregation and chatbot system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Handle OPTIONS requests explicitly
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -18,10 +18,41 @@ class Article(Base):
     extracted_date = Column(DateTime, server_default=func.now())
     is_duplicate = Column(Boolean, default=False)
     cluster_id = Column(Integer, nullable=True)  # For grouping similar articles
-    embedding = Column(Text, nullable=True)  # JSON string of embedding vector
+    embedding = Column(Text, nullable=True)  # Legacy JSON embedding - vectors live in article_embeddings
     
     # Relationships
     highlights = relationship("Highlight", back_populates="article")
+    
+    # Keyset pagination indexes matching /api/news/articles filter + sort
+    __table_args__ = (
+        Index("ix_articles_extracted_id", "extracted_date", "id"),
+        Index("ix_articles_category_extracted_id", "category", "extracted_date", "id"),
+    )
+
+class NewsCluster(Base):
+    __tablename__ = "news_clusters"
+    
+    id = Column(Integer, primary_key=True, index=True)  # Stable cluster_id shared by near-duplicate articles
+    title = Column(Text)  # Representative title + summary, used for embedding confirmation
+    signature = Column(LargeBinary)  # MinHash signature of the representative (uint32 bytes)
+    article_count = Column(Integer, default=1)
+    created_date = Column(DateTime, server_default=func.now())
+
+class LSHBucket(Base):
+    __tablename__ = "lsh_buckets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    bucket = Column(String, index=True)  # "<band>:<hash of the band's signature rows>"
+    cluster_id = Column(Integer, ForeignKey("news_clusters.id"), index=True)
+
+class ArticleEmbedding(Base):
+    __tablename__ = "article_embeddings"
+    
+    article_id = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    model = Column(String)  # Embedding model that produced the vector
+    dim = Column(Integer)
+    vector = Column(LargeBinary)  # Raw float32 bytes
+    created_date = Column(DateTime, server_default=func.now())
 
 class Highlight(Base):
     __tablename__ = "highlights"
@@ -40,6 +71,21 @@ class Highlight(Base):
     
     # Relationships
     article = relationship("Article", back_populates="highlights")
+    
+    # Keyset pagination indexes matching /api/highlights filter + sort (also serves /breaking)
+    __table_args__ = (
+        Index("ix_highlights_breaking_priority_id", "is_breaking", "priority_score", "id"),
+        Index("ix_highlights_category_breaking_priority_id", "category", "is_breaking", "priority_score", "id"),
+    )
+
+class CategoryStat(Base):
+    __tablename__ = "category_stats"
+    
+    category = Column(String, primary_key=True)
+    highlight_count = Column(Integer, default=0)
+    breaking_count = Column(Integer, default=0)
+    max_priority = Column(Float, default=0.0)
+    last_updated = Column(DateTime, server_default=func.now())
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
@@ -50,3 +96,107 @@ class ChatHistory(Base):
     context_articles = Column(Text)  # JSON string of article IDs used
     created_at = Column(DateTime, server_default=func.now())
 
+
+class FeedCache(Base):
+    __tablename__ = "feed_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    rss_url = Column(String, unique=True, index=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    body_hash = Column(String, nullable=True)  # sha256 of the raw feed body
+    entries = Column(Text)  # JSON string of parsed feed entries
+    fetched_date = Column(DateTime, nullable=True)  # Last time the body changed
+    checked_date = Column(DateTime, nullable=True)  # Last time the feed was requested
+    last_entry_id = Column(String, nullable=True)  # Legacy per-URL high-water mark, superseded by feed_marks
+    last_published = Column(DateTime, nullable=True)
+
+
+class FeedMark(Base):
+    """High-water mark per (feed, source) - sources sharing a feed URL advance independently"""
+    __tablename__ = "feed_marks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    rss_url = Column(String)
+    source = Column(String)
+    last_entry_id = Column(String, nullable=True)  # Newest ingested GUID/link
+    last_published = Column(DateTime, nullable=True)  # Its published time (UTC)
+    
+    __table_args__ = (
+        Index("ix_feed_marks_url_source", "rss_url", "source", unique=True),
+    )
+
+
+class SourceHealth(Base):
+    """Per-feed fetch health: circuit-breaker state and recent latencies"""
+    __tablename__ = "source_health"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    rss_url = Column(String, unique=True, index=True)
+    state = Column(String, default="closed")  # closed, open (skipped until open_until), half_open
+    consecutive_failures = Column(Integer, default=0)
+    total_successes = Column(Integer, default=0)
+    total_failures = Column(Integer, default=0)
+    last_status = Column(String, nullable=True)  # ok, timeout, error, http_<code>
+    last_error = Column(Text, nullable=True)
+    latencies = Column(Text, nullable=True)  # JSON list of recent successful fetch times (seconds)
+    last_success_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+    open_until = Column(DateTime, nullable=True)
+
+
+class DataVersion(Base):
+    """Shared change counters, so every worker process can tell when its caches are stale"""
+    __tablename__ = "data_versions"
+    
+    name = Column(String, primary_key=True)  # e.g. "articles"
+    version = Column(Integer, default=0)
+
+
+class SchedulerLease(Base):
+    """Named lease held by one process at a time, e.g. the periodic extraction schedule"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+
+
+class ExtractionJob(Base):
+    __tablename__ = "extraction_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, index=True, default="pending")  # pending, running, completed, failed
+    trigger = Column(String, default="manual")  # manual or scheduled
+    categories = Column(Text)  # JSON list of categories
+    force_refresh = Column(Boolean, default=False)
+    max_entries_per_feed = Column(Integer, nullable=True)
+    message = Column(Text, nullable=True)
+    sources_total = Column(Integer, default=0)
+    sources_done = Column(Integer, default=0)
+    source_timings = Column(Text, nullable=True)  # JSON: rss_url -> status, entries, timings
+    owner = Column(String, nullable=True)  # host:pid:token of the process running the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by the owner while the job is active
+    articles_extracted = Column(Integer, default=0)
+    duplicates_found = Column(Integer, default=0)
+    highlights_created = Column(Integer, default=0)
+    created_date = Column(DateTime, server_default=func.now())
+    started_date = Column(DateTime, nullable=True)
+    finished_date = Column(DateTime, nullable=True)
+
+class ContentTask(Base):
+    """Backlog entry for fetching an article's full page text"""
+    __tablename__ = "content_backlog"
+    
+    article_id = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    status = Column(String, default="pending")  # pending, done, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    bytes_parsed = Column(Integer, default=0)
+    created_date = Column(DateTime, server_default=func.now())
+    updated_date = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_content_backlog_status_next_attempt", status, next_attempt_at),
+    )
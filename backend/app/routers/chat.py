@@ -1,99 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_read_db, get_async_db, AsyncSessionLocal, engine
 from app import models, schemas
-from app.services.rag_service import RAGService
+from app.services.rag_service import get_rag_service
+from app.services.retrieval import get_hybrid_retriever, encode_question
+from app.services.answer_cache import get_answer_cache
+from app.services.pagination import MAX_PAGE_SIZE
+from typing import List, Dict, Tuple
+import asyncio
+import json
 
 router = APIRouter()
 
+async def retrieve_context(db: AsyncSession, request: schemas.ChatRequest) -> List[Dict]:
+    """Top context articles for a chat question, as dicts for the prompt"""
+    # Hybrid BM25 + vector retrieval; request.category filters, otherwise the question's keywords only boost
+    hits = await get_hybrid_retriever().retrieve(
+        db, request.question, top_k=3,  # limit to top 3 for speed
+        category=request.category, max_age_days=request.max_age_days
+    )
+    if hits:
+        result = await db.execute(
+            select(models.Article).where(models.Article.id.in_([article_id for article_id, _ in hits]))
+        )
+        by_id = {art.id: art for art in result.scalars().all()}
+        articles = [by_id[article_id] for article_id, _ in hits if article_id in by_id]
+    else:
+        # Nothing matched - fall back to the most recent articles
+        query = select(models.Article)
+        if request.category:
+            query = query.where(models.Article.category == request.category)
+        result = await db.execute(query.order_by(models.Article.extracted_date.desc()).limit(3))
+        articles = result.scalars().all()
+    
+    # Convert to dict format - include content if summary is missing
+    relevant_articles = [
+        {
+            "id": art.id,
+            "title": art.title,
+            "summary": art.summary or (art.content[:200] if art.content else ""),
+            "source": art.source,
+            "author": art.author or "Unknown",
+            "category": art.category
+        }
+        for art in articles
+    ]
+    return relevant_articles
+
+async def generate_answer(request: schemas.ChatRequest, relevant_articles: List[Dict]) -> Tuple[Dict, bool]:
+    """Answer from the LLM, or a fallback; the flag says whether the answer may be cached"""
+    rag_service = get_rag_service()
+    
+    # Generate response with timeout (run in thread to prevent blocking)
+    try:
+        # Wrap the synchronous call in a thread with timeout
+        loop = asyncio.get_event_loop()
+        response = await asyncio.wait_for(
+            loop.run_in_executor(
+                None,  # Use default executor
+                lambda: rag_service.generate_response(
+                    request.question,
+                    relevant_articles,
+                    request.category
+                )
+            ),
+            timeout=20.0  # 20 second timeout for GPT response
+        )
+        # Only real model answers are cached - not fallbacks or error messages
+        return response, bool(rag_service.client and response["related_articles"])
+    except asyncio.TimeoutError:
+        # Fallback response if GPT times out
+        response = {
+            "answer": f"Based on the recent news, here are some relevant articles: {', '.join([art.get('title', '')[:50] for art in relevant_articles[:2]])}",
+            "sources": list(set([art.get("source", "Unknown") for art in relevant_articles])),
+            "related_articles": [art.get("id") for art in relevant_articles if art.get("id")]
+        }
+    except Exception as e:
+        # Fallback if GPT fails for any reason
+        print(f"Error generating GPT response: {e}")
+        response = {
+            "answer": f"Here are some relevant articles: {', '.join([art.get('title', '')[:50] for art in relevant_articles[:2]])}",
+            "sources": list(set([art.get("source", "Unknown") for art in relevant_articles])),
+            "related_articles": [art.get("id") for art in relevant_articles if art.get("id")]
+        }
+    return response, False
+
 @router.post("/ask", response_model=schemas.ChatResponse)
 async def ask_question(
     request: schemas.ChatRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Ask a question about news highlights using RAG - Fast mode"""
     try:
-        rag_service = RAGService()
-        import asyncio
-        
-        # Get recent articles for context - don't require highlights
-        query = db.query(models.Article)
-        
-        # Filter by category if question mentions a specific category
-        question_lower = request.question.lower()
-        if 'sport' in question_lower or 'sports' in question_lower:
-            query = query.filter(models.Article.category == 'sports')
-        elif 'finance' in question_lower or 'business' in question_lower or 'economic' in question_lower:
-            query = query.filter(models.Article.category == 'finance')
-        elif 'music' in question_lower:
-            query = query.filter(models.Article.category == 'music')
-        elif 'lifestyle' in question_lower:
-            query = query.filter(models.Article.category == 'lifestyle')
-        elif request.category:
-            query = query.filter(models.Article.category == request.category)
-        
-        articles = query.order_by(
-            models.Article.extracted_date.desc()
-        ).limit(20).all()  # Reduced from 100 to 20 for faster processing
-        
-        # Convert to dict format - include content if summary is missing
-        articles_data = []
-        for art in articles:
-            article_dict = {
-                "id": art.id,
-                "title": art.title,
-                "summary": art.summary or art.content[:200] if art.content else "",
-                "source": art.source,
-                "author": art.author or "Unknown",
-                "category": art.category
-            }
-            articles_data.append(article_dict)
+        relevant_articles = await retrieve_context(db, request)
         
-        # Find relevant articles (limit to top 3 for speed)
-        # Use simple keyword matching instead of embeddings for speed
-        question_lower = request.question.lower()
-        relevant_articles = articles_data[:3]  # Just take first 3 for speed
-        
-        # Simple keyword filtering
-        if articles_data:
-            keyword_matches = [
-                art for art in articles_data
-                if any(keyword in art.get("title", "").lower() or keyword in art.get("summary", "").lower() 
-                      for keyword in question_lower.split() if len(keyword) > 3)
-            ]
-            if keyword_matches:
-                relevant_articles = keyword_matches[:3]
-        
-        # Generate response with timeout (run in thread to prevent blocking)
-        try:
-            # Wrap the synchronous call in a thread with timeout
-            loop = asyncio.get_event_loop()
-            response = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,  # Use default executor
-                    lambda: rag_service.generate_response(
-                        request.question,
-                        relevant_articles,
-                        request.category
-                    )
-                ),
-                timeout=20.0  # 20 second timeout for GPT response
-            )
-        except asyncio.TimeoutError:
-            # Fallback response if GPT times out
-            response = {
-                "answer": f"Based on the recent news, here are some relevant articles: {', '.join([art.get('title', '')[:50] for art in relevant_articles[:2]])}",
-                "sources": list(set([art.get("source", "Unknown") for art in relevant_articles])),
-                "related_articles": [art.get("id") for art in relevant_articles if art.get("id")]
-            }
-        except Exception as e:
-            # Fallback if GPT fails for any reason
-            print(f"Error generating GPT response: {e}")
-            response = {
-                "answer": f"Here are some relevant articles: {', '.join([art.get('title', '')[:50] for art in relevant_articles[:2]])}",
-                "sources": list(set([art.get("source", "Unknown") for art in relevant_articles])),
-                "related_articles": [art.get("id") for art in relevant_articles if art.get("id")]
-            }
+        # Same context + a near-identical question -> reuse the earlier answer without an LLM call
+        answer_cache = get_answer_cache()
+        await asyncio.to_thread(answer_cache.sync_version, engine)
+        context_ids = [art["id"] for art in relevant_articles]
+        question_vector = await asyncio.to_thread(encode_question, request.question)
+        response = answer_cache.get(request.question, question_vector, context_ids)
+        cached = response is not None
+        if not cached:
+            response, cacheable = await generate_answer(request, relevant_articles)
+            if cacheable:
+                answer_cache.set(request.question, question_vector, context_ids, response)
         
         # Save chat history
         chat_history = models.ChatHistory(
@@ -102,22 +116,89 @@ async def ask_question(
             context_articles=str(response["related_articles"])
         )
         db.add(chat_history)
-        db.commit()
+        await db.commit()
         
         return schemas.ChatResponse(
             answer=response["answer"],
             sources=response["sources"],
-            related_articles=response["related_articles"]
+            related_articles=response["related_articles"],
+            cached=cached
         )
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/ask/stream")
+async def ask_question_stream(
+    request: schemas.ChatRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Ask a question and stream the answer as Server-Sent Events.
+    
+    Events: `sources` (sources + related_articles, sent as soon as retrieval is done),
+    then `token` ({"text": ...}) per chunk, then `done` ({"answer": ...}) or `error`.
+    """
+    rag_service = get_rag_service()
+    relevant_articles = await retrieve_context(db, request)
+    sources = rag_service.sources_for(relevant_articles)
+    
+    answer_cache = get_answer_cache()
+    await asyncio.to_thread(answer_cache.sync_version, engine)
+    context_ids = [art["id"] for art in relevant_articles]
+    question_vector = await asyncio.to_thread(encode_question, request.question)
+    cached_response = answer_cache.get(request.question, question_vector, context_ids)
+    
+    async def events():
+        yield sse_event("sources", sources)
+        
+        if cached_response is not None:
+            answer = cached_response["answer"]
+            yield sse_event("token", {"text": answer})
+        else:
+            chunks = []
+            try:
+                async for text in rag_service.stream_response(request.question, relevant_articles):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                print(f"Error streaming GPT response: {e}")
+                yield sse_event("error", {"detail": "I encountered an error while processing your question. Please try again."})
+                return
+            
+            answer = "".join(chunks).strip()
+            if rag_service.async_client and context_ids:
+                answer_cache.set(request.question, question_vector, context_ids, {"answer": answer, **sources})
+        
+        # The request's session is closed once the response starts, so history gets its own
+        try:
+            async with AsyncSessionLocal() as history_db:
+                history_db.add(models.ChatHistory(
+                    question=request.question,
+                    answer=answer,
+                    context_articles=str(sources["related_articles"])
+                ))
+                await history_db.commit()
+        except Exception as e:
+            print(f"Error saving chat history: {e}")
+        
+        yield sse_event("done", {"answer": answer, "cached": cached_response is not None})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies (nginx, Render) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/history")
 def get_chat_history(
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
 ):
     """Get chat history"""
     history = db.query(models.ChatHistory).order_by(
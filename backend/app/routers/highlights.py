@@ -1,87 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app import models, schemas
-from typing import List
+from app.services.response_cache import cached_json_response
+from app.services.highlights_processor import HighlightsProcessor
+from app.services.pagination import decode_cursor, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
+from typing import List, Optional
 
 router = APIRouter()
 
+def highlight_to_dict(highlight: models.Highlight) -> dict:
+    """Convert sources and authors from strings to lists"""
+    return {
+        "id": highlight.id,
+        "article_id": highlight.article_id,
+        "title": highlight.title,
+        "summary": highlight.summary,
+        "category": highlight.category,
+        "frequency": highlight.frequency,
+        "priority_score": highlight.priority_score,
+        "sources": highlight.sources.split(",") if highlight.sources else [],
+        "authors": highlight.authors.split(",") if highlight.authors else [],
+        "is_breaking": highlight.is_breaking,
+        "created_date": highlight.created_date
+    }
+
+def cursor_bool(value) -> bool:
+    if not isinstance(value, bool):
+        raise TypeError("Expected a boolean")
+    return value
+
+def cursor_float(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError("Expected a number")
+    return float(value)
+
+def cursor_int(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError("Expected an integer")
+    return value
+
+def parse_cursor(cursor: Optional[str], types: List) -> Optional[list]:
+    """Decode a cursor and check each value with its converter from `types`"""
+    if not cursor:
+        return None
+    try:
+        values = decode_cursor(cursor, len(types))
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/", response_model=List[schemas.Highlight])
 def get_highlights(
+    request: Request,
     category: str = None,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get news highlights, optionally filtered by category"""
-    query = db.query(models.Highlight)
-    
-    if category:
-        query = query.filter(models.Highlight.category == category)
+    """Get news highlights, optionally filtered by category.
     
-    highlights = query.order_by(
-        models.Highlight.is_breaking.desc(),
-        models.Highlight.priority_score.desc()
-    ).limit(limit).all()
+    Pages are keyset-paginated: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    after = parse_cursor(cursor, [cursor_bool, cursor_float, cursor_int])
     
-    # Convert sources and authors from strings to lists
-    result = []
-    for highlight in highlights:
-        highlight_dict = {
-            "id": highlight.id,
-            "article_id": highlight.article_id,
-            "title": highlight.title,
-            "summary": highlight.summary,
-            "category": highlight.category,
-            "frequency": highlight.frequency,
-            "priority_score": highlight.priority_score,
-            "sources": highlight.sources.split(",") if highlight.sources else [],
-            "authors": highlight.authors.split(",") if highlight.authors else [],
-            "is_breaking": highlight.is_breaking,
-            "created_date": highlight.created_date
-        }
-        result.append(highlight_dict)
+    def build():
+        query = db.query(models.Highlight)
+        
+        if category:
+            query = query.filter(models.Highlight.category == category)
+        
+        if after:
+            query = query.filter(
+                tuple_(models.Highlight.is_breaking, models.Highlight.priority_score, models.Highlight.id)
+                < tuple_(*after)
+            )
+        
+        highlights = query.order_by(
+            models.Highlight.is_breaking.desc(),
+            models.Highlight.priority_score.desc(),
+            models.Highlight.id.desc()
+        ).limit(limit).all()
+        
+        return [highlight_to_dict(highlight) for highlight in highlights]
     
-    return result
+    return cached_json_response(request, build, lambda data: {
+        NEXT_CURSOR_HEADER: next_cursor(data, limit, ["is_breaking", "priority_score", "id"])
+    })
 
 @router.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_read_db)):
     """Get available categories with counts"""
-    categories = db.query(models.Highlight.category).distinct().all()
-    result = {}
-    
-    for (category,) in categories:
-        count = db.query(models.Highlight).filter(
-            models.Highlight.category == category
-        ).count()
-        result[category] = count
+    def build():
+        # Materialized by the extraction pipeline - one read of a tiny table
+        stats = db.query(models.CategoryStat.category, models.CategoryStat.highlight_count).all()
+        if stats:
+            return {category: count for category, count in stats}
+        
+        # Not materialized yet (e.g. before the first extraction) - single GROUP BY
+        return {
+            category: count
+            for category, count, _, _ in HighlightsProcessor.category_aggregates(db)
+            if category is not None
+        }
     
-    return result
+    return cached_json_response(request, build)
 
 @router.get("/breaking")
-def get_breaking_news(db: Session = Depends(get_db)):
-    """Get breaking news highlights"""
-    highlights = db.query(models.Highlight).filter(
-        models.Highlight.is_breaking == True
-    ).order_by(
-        models.Highlight.priority_score.desc()
-    ).all()
+def get_breaking_news(
+    request: Request,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get breaking news highlights (keyset-paginated like /)"""
+    after = parse_cursor(cursor, [cursor_float, cursor_int])
     
-    result = []
-    for highlight in highlights:
-        highlight_dict = {
-            "id": highlight.id,
-            "article_id": highlight.article_id,
-            "title": highlight.title,
-            "summary": highlight.summary,
-            "category": highlight.category,
-            "frequency": highlight.frequency,
-            "priority_score": highlight.priority_score,
-            "sources": highlight.sources.split(",") if highlight.sources else [],
-            "authors": highlight.authors.split(",") if highlight.authors else [],
-            "is_breaking": highlight.is_breaking,
-            "created_date": highlight.created_date
-        }
-        result.append(highlight_dict)
+    def build():
+        query = db.query(models.Highlight).filter(
+            models.Highlight.is_breaking == True
+        )
+        
+        if after:
+            query = query.filter(
+                tuple_(models.Highlight.priority_score, models.Highlight.id) < tuple_(*after)
+            )
+        
+        highlights = query.order_by(
+            models.Highlight.priority_score.desc(),
+            models.Highlight.id.desc()
+        ).limit(limit).all()
+        
+        return [highlight_to_dict(highlight) for highlight in highlights]
     
-    return result
-
+    return cached_json_response(request, build, lambda data: {
+        NEXT_CURSOR_HEADER: next_cursor(data, limit, ["priority_score", "id"])
+    })
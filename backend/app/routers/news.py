@@ -1,203 +1,158 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_read_db
 from app import models, schemas
-from app.services.news_extractor import NewsExtractor
-from app.services.categorizer import NewsCategorizer
-from app.services.summarizer import NewsSummarizer
-from app.services.highlights_processor import HighlightsProcessor
+from app.services.job_scheduler import get_job_scheduler
+from app.services.response_cache import cached_json_response
+from app.services.pagination import decode_cursor, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
+from app.services.search_index import search_articles
+from app.services.content_enricher import get_content_enricher
+from app.services.source_health import SourceHealthStore
 from datetime import datetime
-import asyncio
+from typing import Optional
+import json
 
 router = APIRouter()
 
+def job_to_dict(job: models.ExtractionJob) -> dict:
+    """Convert an extraction job row to its API representation"""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "trigger": job.trigger,
+        "categories": json.loads(job.categories or "[]"),
+        "message": job.message,
+        "sources_total": job.sources_total or 0,
+        "sources_done": job.sources_done or 0,
+        "source_timings": json.loads(job.source_timings or "{}"),
+        "articles_extracted": job.articles_extracted or 0,
+        "duplicates_found": job.duplicates_found or 0,
+        "highlights_created": job.highlights_created or 0,
+        "created_date": job.created_date,
+        "started_date": job.started_date,
+        "finished_date": job.finished_date
+    }
+
 @router.post("/extract", response_model=schemas.ExtractionResponse)
-async def extract_news(
-    request: schemas.ExtractionRequest,
-    db: Session = Depends(get_db)
-):
-    """Extract news articles from Australian news outlets"""
+async def extract_news(request: schemas.ExtractionRequest):
+    """Queue a background extraction job and return its id immediately"""
+    # Use requested categories, but prioritize sports and music (most reliable)
+    if request.categories:
+        categories_to_extract = request.categories
+    else:
+        # Default to sports and music for faster, more reliable extraction
+        categories_to_extract = ["sports", "music"]
+    
     try:
-        extractor = NewsExtractor()
-        highlights_processor = HighlightsProcessor()
-        
-        # Use requested categories, but prioritize sports and music (most reliable)
-        if request.categories:
-            categories_to_extract = request.categories
-        else:
-            # Default to sports and music for faster, more reliable extraction
-            categories_to_extract = ["sports", "music"]
-        
-        # Extract with shorter timeout (30 seconds) for faster response
-        async with extractor:
-            try:
-                articles_data = await asyncio.wait_for(
-                    extractor.extract_all_articles(categories_to_extract),
-                    timeout=30.0  # 30 second timeout
-                )
-            except asyncio.TimeoutError:
-                return schemas.ExtractionResponse(
-                    message="Extraction timed out - Backend may be slow. Try again in 30 seconds.",
-                    articles_extracted=0,
-                    duplicates_found=0,
-                    highlights_created=0
-                )
-            except Exception as e:
-                print(f"Extraction error: {e}")
-                return schemas.ExtractionResponse(
-                    message=f"Extraction error: {str(e)[:100]}",
-                    articles_extracted=0,
-                    duplicates_found=0,
-                    highlights_created=0
-                )
-        
-        if not articles_data:
-            return schemas.ExtractionResponse(
-                message="No articles extracted - RSS feeds may be unavailable",
-                articles_extracted=0,
-                duplicates_found=0,
-                highlights_created=0
-            )
-        
-        # Limit to reasonable number to avoid timeouts (max 10 articles)
-        articles_data = articles_data[:10]
-        
-        # Simple duplicate detection using URL only (avoid memory-intensive embeddings)
-        seen_urls = set()
-        unique_articles = []
-        for article in articles_data:
-            url = article.get("source_url", "")
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                # Add simple hash-based cluster_id
-                article["cluster_id"] = hash(article.get("title", "")) % 1000
-                article["is_duplicate"] = False
-                unique_articles.append(article)
-        
-        articles_data = unique_articles
-        
-        # Process articles - use RSS summaries, skip embeddings to save memory
-        articles_created = 0
-        duplicates_count = 0
-        processed_articles = []
-        
-        for article_data in articles_data:
-            # Check if article already exists
-            existing = db.query(models.Article).filter(
-                models.Article.source_url == article_data.get("source_url", "")
-            ).first()
-            
-            if existing and not request.force_refresh:
-                processed_articles.append(existing)
-                continue
-            
-            # Use RSS summary if available, otherwise use title
-            summary = article_data.get("summary", "")
-            if not summary or len(summary) < 30:
-                summary = article_data.get("title", "") + " - " + article_data.get("source", "Unknown")
-            
-            # Skip embedding generation to save memory - use empty array
-            embedding_json = "[]"
-            
-            # Create or update article
-            if existing:
-                for key, value in article_data.items():
-                    if key != "summary":
-                        setattr(existing, key, value)
-                existing.summary = summary[:1000]
-                existing.embedding = embedding_json
-                existing.is_duplicate = article_data.get("is_duplicate", False)
-                existing.cluster_id = article_data.get("cluster_id")
-                existing.extracted_date = datetime.now()
-                article = existing
-                processed_articles.append(article)
-            else:
-                article_dict = {k: v for k, v in article_data.items() if k != "summary"}
-                article = models.Article(
-                    **article_dict,
-                    summary=summary[:1000],
-                    embedding=embedding_json,
-                    extracted_date=datetime.now()
-                )
-                db.add(article)
-                articles_created += 1
-                processed_articles.append(article)
-            
-            if article_data.get("is_duplicate", False):
-                duplicates_count += 1
-        
-        # Single commit for all articles
-        db.commit()
-        
-        # Commit articles
-        db.commit()
-        
-        # Refresh articles to get IDs
-        for article in processed_articles:
-            db.refresh(article)
-        
-        # Create highlights from processed articles
-        articles_for_highlights = [
-            {
-                "id": art.id,
-                "title": art.title,
-                "summary": art.summary or "",
-                "category": art.category,
-                "source": art.source,
-                "author": art.author or "Unknown",
-                "cluster_id": art.cluster_id
-            }
-            for art in processed_articles if art.id
-        ]
-        
-        highlights_data = highlights_processor.create_highlights(articles_for_highlights)
-        
-        # Clear old highlights and create new ones
-        db.query(models.Highlight).delete()
-        
-        highlights_created = 0
-        for highlight_data in highlights_data:
-            highlight = models.Highlight(
-                article_id=highlight_data["article_id"],
-                title=highlight_data["title"],
-                summary=highlight_data["summary"],
-                category=highlight_data["category"],
-                frequency=highlight_data["frequency"],
-                priority_score=highlight_data["priority_score"],
-                sources=",".join(highlight_data["sources"]),
-                authors=",".join(highlight_data["authors"]),
-                is_breaking=highlight_data["is_breaking"]
-            )
-            db.add(highlight)
-            highlights_created += 1
-        
-        db.commit()
-        
-        return schemas.ExtractionResponse(
-            message="News extraction completed successfully",
-            articles_extracted=articles_created,
-            duplicates_found=duplicates_count,
-            highlights_created=highlights_created
+        job, created = await get_job_scheduler().submit(
+            categories_to_extract,
+            force_refresh=request.force_refresh,
+            max_entries_per_feed=request.max_entries_per_feed
         )
-    
     except Exception as e:
-        db.rollback()
         error_msg = str(e)[:200]  # Limit error message length
         print(f"Extraction exception: {error_msg}")
         raise HTTPException(status_code=500, detail=f"Extraction failed: {error_msg}")
+    
+    return schemas.ExtractionResponse(
+        message="News extraction started" if created else "News extraction already in progress",
+        articles_extracted=job.articles_extracted or 0,
+        duplicates_found=job.duplicates_found or 0,
+        highlights_created=job.highlights_created or 0,
+        job_id=job.id,
+        status=job.status
+    )
+
+@router.get("/jobs", response_model=list[schemas.ExtractionJob])
+def get_jobs(limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_read_db)):
+    """Get recent extraction jobs"""
+    jobs = db.query(models.ExtractionJob).order_by(
+        models.ExtractionJob.id.desc()
+    ).limit(limit).all()
+    return [job_to_dict(job) for job in jobs]
+
+@router.get("/jobs/{job_id}", response_model=schemas.ExtractionJob)
+def get_job(job_id: int, db: Session = Depends(get_read_db)):
+    """Get progress and per-source timings for an extraction job"""
+    job = db.query(models.ExtractionJob).filter(models.ExtractionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@router.get("/enrichment")
+def get_enrichment_status(db: Session = Depends(get_read_db)):
+    """Content-enrichment backlog and throughput (pages/sec, bytes parsed)"""
+    return get_content_enricher().metrics(db)
+
+@router.get("/sources/health")
+def get_source_health(db: Session = Depends(get_read_db)):
+    """Per-feed circuit state, success rate, latency percentiles and current timeout"""
+    return SourceHealthStore(db).report()
 
 @router.get("/articles", response_model=list[schemas.Article])
 def get_articles(
+    request: Request,
     category: str = None,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get articles, optionally filtered by category"""
-    query = db.query(models.Article)
+    """Get articles, optionally filtered by category.
     
-    if category:
-        query = query.filter(models.Article.category == category)
+    Pages are keyset-paginated: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    after = None
+    if cursor:
+        try:
+            extracted_date, article_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(extracted_date), int(article_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    articles = query.order_by(models.Article.extracted_date.desc()).limit(limit).all()
-    return articles
+    def build():
+        query = db.query(models.Article)
+        
+        if category:
+            query = query.filter(models.Article.category == category)
+        
+        if after:
+            query = query.filter(
+                tuple_(models.Article.extracted_date, models.Article.id) < tuple_(*after)
+            )
+        
+        articles = query.order_by(
+            models.Article.extracted_date.desc(),
+            models.Article.id.desc()
+        ).limit(limit).all()
+        return [schemas.Article.model_validate(article) for article in articles]
+    
+    return cached_json_response(request, build, lambda data: {
+        NEXT_CURSOR_HEADER: next_cursor(data, limit, ["extracted_date", "id"])
+    })
+
 
+@router.get("/search", response_model=list[schemas.ArticleSearchResult])
+def search_news(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: str = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    match_all: bool = False,
+    db: Session = Depends(get_read_db)
+):
+    """Full-text search over article title, summary and content, best matches first"""
+    hits = search_articles(db, q, limit=limit, category=category, match_all=match_all)
+    if not hits:
+        return []
+    
+    articles = db.query(models.Article).filter(
+        models.Article.id.in_([article_id for article_id, _ in hits])
+    ).all()
+    by_id = {article.id: article for article in articles}
+    return [
+        schemas.ArticleSearchResult(
+            **schemas.Article.model_validate(by_id[article_id]).model_dump(),
+            score=score
+        )
+        for article_id, score in hits if article_id in by_id
+    ]
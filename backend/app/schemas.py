@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 class ArticleBase(BaseModel):
     title: str
@@ -24,6 +24,9 @@ class Article(ArticleBase):
     class Config:
         from_attributes = True
 
+class ArticleSearchResult(Article):
+    score: float
+
 class HighlightBase(BaseModel):
     title: str
     summary: str
@@ -45,19 +48,40 @@ class Highlight(HighlightBase):
 class ChatRequest(BaseModel):
     question: str
     category: Optional[str] = None
+    max_age_days: Optional[int] = None  # Only use articles from the last N days as context
 
 class ChatResponse(BaseModel):
     answer: str
     sources: List[str]
     related_articles: List[int]
+    cached: bool = False  # Served from the semantic answer cache
 
 class ExtractionRequest(BaseModel):
     categories: List[str] = ["sports", "lifestyle", "music", "finance"]
     force_refresh: bool = False
+    max_entries_per_feed: Optional[int] = Field(None, ge=1, le=500)  # Per-run ingestion budget per feed
 
 class ExtractionResponse(BaseModel):
     message: str
     articles_extracted: int
     duplicates_found: int
     highlights_created: int
+    job_id: Optional[int] = None
+    status: Optional[str] = None
+
+class ExtractionJob(BaseModel):
+    id: int
+    status: str
+    trigger: str
+    categories: List[str]
+    message: Optional[str] = None
+    sources_total: int
+    sources_done: int
+    source_timings: Dict[str, Dict[str, Any]]
+    articles_extracted: int
+    duplicates_found: int
+    highlights_created: int
+    created_date: Optional[datetime] = None
+    started_date: Optional[datetime] = None
+    finished_date: Optional[datetime] = None
 
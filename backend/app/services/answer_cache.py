@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Set, Tuple
+from collections import OrderedDict
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+import numpy as np
+from sqlalchemy.engine import Engine
+from app.services.response_cache import read_shared_version
+
+class AnswerCache:
+    """In-process semantic cache of chat answers.
+
+    An entry is keyed by the fingerprint of its context article ids plus the normalized
+    question embedding: a new question hits when the same articles were retrieved and
+    its embedding is within SIMILARITY_THRESHOLD (cosine) of a cached question.
+    Entries expire after a TTL, are evicted LRU, and are dropped when any of their
+    context articles change - in this process directly, and in other worker processes
+    when the shared data version is seen to move (polled at most every VERSION_POLL seconds).
+    """
+
+    SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+    TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+    VERSION_POLL = float(os.getenv("ANSWER_CACHE_VERSION_POLL", "2"))
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None,
+                 threshold: Optional[float] = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else self.TTL
+        self.threshold = threshold if threshold is not None else self.SIMILARITY_THRESHOLD
+        # entry id -> (normalized question, unit vector or None, fingerprint, article ids, response, stored_at)
+        self._entries: "OrderedDict[int, Tuple[str, Optional[np.ndarray], str, Tuple[int, ...], Dict, float]]" = OrderedDict()
+        self._by_fingerprint: Dict[str, Set[int]] = {}
+        self._by_article: Dict[int, Set[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._shared_version: Optional[int] = None
+        self._polled_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        return " ".join(re.findall(r"\w+", question.lower()))
+
+    @staticmethod
+    def fingerprint(article_ids: List[int]) -> str:
+        """Order-insensitive fingerprint of the retrieved context"""
+        return hashlib.sha1(",".join(str(i) for i in sorted(set(article_ids))).encode()).hexdigest()
+
+    @staticmethod
+    def unit(vector) -> Optional[np.ndarray]:
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _drop(self, entry_id: int):
+        _, _, fingerprint, article_ids, _, _ = self._entries.pop(entry_id)
+        self._by_fingerprint[fingerprint].discard(entry_id)
+        if not self._by_fingerprint[fingerprint]:
+            del self._by_fingerprint[fingerprint]
+        for article_id in article_ids:
+            entries = self._by_article.get(article_id)
+            if entries is not None:
+                entries.discard(entry_id)
+                if not entries:
+                    del self._by_article[article_id]
+
+    def sync_version(self, engine: Engine):
+        """Clear the cache if the shared data version moved since the last poll"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._polled_at < self.VERSION_POLL:
+                return
+            self._polled_at = now
+        shared = read_shared_version(engine)
+        if shared is None:
+            return
+        if shared != self._shared_version:
+            first_poll = self._shared_version is None
+            self._shared_version = shared
+            if not first_poll:
+                self.clear()
+
+    def get(self, question: str, vector, article_ids: List[int]) -> Optional[Dict]:
+        """Cached response for a question over the same context, or None"""
+        normalized = self.normalize_question(question)
+        unit = self.unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_fingerprint.get(self.fingerprint(article_ids), ())):
+                cached_question, cached_unit, _, _, _, stored_at = self._entries[entry_id]
+                if now - stored_at > self.ttl:
+                    self._drop(entry_id)
+                    continue
+                if cached_question == normalized:
+                    score = 1.0
+                elif unit is not None and cached_unit is not None:
+                    score = float(cached_unit @ unit)
+                else:
+                    continue
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][4]
+
+    def set(self, question: str, vector, article_ids: List[int], response: Dict):
+        """Cache a response produced from exactly these context articles"""
+        fingerprint = self.fingerprint(article_ids)
+        article_ids = tuple(sorted(set(article_ids)))
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (
+                self.normalize_question(question), self.unit(vector), fingerprint,
+                article_ids, response, time.monotonic()
+            )
+            self._by_fingerprint.setdefault(fingerprint, set()).add(entry_id)
+            for article_id in article_ids:
+                self._by_article.setdefault(article_id, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_articles(self, article_ids: List[int]):
+        """Drop every answer whose context included one of these (changed) articles"""
+        with self._lock:
+            stale = set()
+            for article_id in article_ids:
+                stale |= self._by_article.get(article_id, set())
+            for entry_id in stale:
+                self._drop(entry_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_fingerprint.clear()
+            self._by_article.clear()
+
+_cache: Optional[AnswerCache] = None
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide chat answer cache"""
+    global _cache
+    if _cache is None:
+        _cache = AnswerCache()
+    return _cache
@@ -0,0 +1,108 @@
+from typing import List, Dict, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite, postgresql
+from app import models
+
+class ArticleStore:
+    """Batched article persistence - one lookup query plus one bulk upsert per run"""
+    
+    # Columns written by the ingestion pipeline
+    WRITE_COLUMNS = [
+        "title", "content", "summary", "author", "source", "source_url", "category",
+        "published_date", "extracted_date", "is_duplicate", "cluster_id"
+    ]
+    
+    # Columns compared to decide whether an existing row has changed (a new cluster_id
+    # means the article was re-clustered, e.g. after its legacy id was cleared)
+    COMPARE_COLUMNS = ["title", "summary", "author", "category", "cluster_id"]
+    
+    # Set on insert only - afterwards content belongs to the enrichment stage (full page text)
+    INSERT_ONLY_COLUMNS = ["content"]
+    
+    # Keep IN (...) lists below SQLite's bound-parameter limit
+    LOOKUP_CHUNK_SIZE = 500
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def find_existing(self, urls: List[str]) -> Dict[str, Dict]:
+        """Look up existing articles by source_url using IN queries"""
+        columns = [models.Article.id] + [getattr(models.Article, c) for c in self.COMPARE_COLUMNS] + [
+            models.Article.source, models.Article.source_url
+        ]
+        existing = {}
+        for i in range(0, len(urls), self.LOOKUP_CHUNK_SIZE):
+            chunk = urls[i:i + self.LOOKUP_CHUNK_SIZE]
+            for row in self.db.query(*columns).filter(models.Article.source_url.in_(chunk)):
+                existing[row.source_url] = dict(row._mapping)
+        return existing
+    
+    def upsert_articles(self, rows: List[Dict], force_refresh: bool = False) -> Tuple[List[Dict], int]:
+        """Insert new and write changed articles in bulk.
+        
+        Returns the stored articles (with ids) and the number of newly created rows.
+        Unchanged existing articles are returned as-is without being rewritten;
+        inserted or rewritten ones are flagged with "changed": True.
+        """
+        rows = [{k: v for k, v in row.items() if k in self.WRITE_COLUMNS} for row in rows if row.get("source_url")]
+        existing = self.find_existing([row["source_url"] for row in rows])
+        
+        to_write = []
+        stored = []
+        created = 0
+        for row in rows:
+            current = existing.get(row["source_url"])
+            if current is None:
+                created += 1
+                to_write.append(row)
+            elif force_refresh or any(current.get(c) != row.get(c) for c in self.COMPARE_COLUMNS):
+                to_write.append(row)
+            else:
+                stored.append(current)
+        
+        ids = self._bulk_upsert(to_write) if to_write else {}
+        for row in to_write:
+            stored.append({**row, "id": ids.get(row["source_url"]), "changed": True})
+        
+        return stored, created
+    
+    def _bulk_upsert(self, rows: List[Dict]) -> Dict[str, int]:
+        """INSERT ... ON CONFLICT(source_url) DO UPDATE, returning ids keyed by source_url"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            insert = sqlite.insert
+        elif dialect == "postgresql":
+            insert = postgresql.insert
+        else:
+            return self._merge_rows(rows)
+        
+        stmt = insert(models.Article)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.Article.source_url],
+            set_={
+                c: stmt.excluded[c] for c in self.WRITE_COLUMNS
+                if c != "source_url" and c not in self.INSERT_ONLY_COLUMNS
+            }
+        ).returning(models.Article.id, models.Article.source_url)
+        
+        result = self.db.execute(stmt, rows)
+        return {source_url: article_id for article_id, source_url in result.all()}
+    
+    def _merge_rows(self, rows: List[Dict]) -> Dict[str, int]:
+        """Fallback for dialects without ON CONFLICT support"""
+        urls = [row["source_url"] for row in rows]
+        articles = {
+            a.source_url: a for a in self.db.query(models.Article).filter(models.Article.source_url.in_(urls))
+        }
+        for row in rows:
+            article = articles.get(row["source_url"])
+            if article is None:
+                article = models.Article(**row)
+                self.db.add(article)
+                articles[row["source_url"]] = article
+            else:
+                for key, value in row.items():
+                    if key not in self.INSERT_ONLY_COLUMNS:
+                        setattr(article, key, value)
+        self.db.flush()
+        return {url: article.id for url, article in articles.items()}
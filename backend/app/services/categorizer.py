@@ -1,41 +1,34 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
+from sqlalchemy.orm import Session
+from app.services.embedding_model import get_embedding_model
+from app.services.near_duplicates import NearDuplicateIndex, get_min_hasher
+from app.services.keyword_matcher import get_keyword_matcher
 
 # Lazy import to avoid loading heavy models unless needed
-_sentence_transformer = None
 _numpy = None
 
 def get_sentence_transformer():
-    """Lazy load sentence transformer only when needed (for chat/RAG)"""
-    global _sentence_transformer
-    if _sentence_transformer is None:
-        from sentence_transformers import SentenceTransformer
-        _sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-    return _sentence_transformer
+    """Shared embedding model, loaded lazily by the process-wide registry"""
+    return get_embedding_model()
 
 class NewsCategorizer:
     """Categorize and detect duplicate news articles - Memory optimized"""
     
     def __init__(self):
         # Don't load model here - only load when needed (saves memory)
-        self.category_keywords = {
-            "sports": ["sport", "game", "match", "player", "team", "championship", "league", "football", "cricket", "rugby", "tennis", "olympics"],
-            "lifestyle": ["lifestyle", "health", "wellness", "food", "travel", "fashion", "beauty", "home", "garden", "recipe", "diet"],
-            "music": ["music", "song", "album", "artist", "concert", "festival", "band", "singer", "musician", "chart", "billboard"],
-            "finance": ["finance", "business", "economy", "stock", "market", "investment", "bank", "money", "financial", "trading", "dollar", "currency"]
-        }
+        self.matcher = get_keyword_matcher()
+        self.category_keywords = self.matcher.rules["categories"]
     
     def categorize_article(self, title: str, content: str) -> str:
         """Categorize article based on title and content"""
-        text = (title + " " + content).lower()
+        hits = self.matcher.scan(title + " " + content)
         
-        scores = {}
-        for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text)
-            scores[category] = score
+        scores = {category: 0 for category in self.category_keywords}
+        scores.update(hits.category_scores())
         
         # Return category with highest score, default to first category if tie
-        if max(scores.values()) > 0:
+        if scores and max(scores.values()) > 0:
             return max(scores, key=scores.get)
         return "lifestyle"  # Default category
     
@@ -49,37 +42,44 @@ class NewsCategorizer:
         model = get_sentence_transformer()
         return model.encode(text)
     
-    def detect_duplicates(self, articles: List[Dict]) -> List[Dict]:
-        """Detect duplicate articles using simple URL-based matching (memory-efficient)"""
-        if len(articles) < 2:
-            for article in articles:
-                article.setdefault('cluster_id', hash(article.get('title', '')) % 1000)
-                article.setdefault('is_duplicate', False)
-            return articles
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32):
+        """Generate embeddings for many texts with one batched encode call"""
+        model = get_sentence_transformer()
+        return model.encode(texts, batch_size=batch_size)
+    
+    def detect_duplicates(self, articles: List[Dict], db: Optional[Session] = None) -> List[Dict]:
+        """Cluster near-duplicate articles using MinHash/LSH over title + summary.
         
-        # Simple duplicate detection: group by similar titles (first 50 chars)
-        seen_titles = {}
-        processed_articles = []
-        cluster_id_counter = 0
+        With a db session, cluster ids come from the persistent LSH index and stay stable
+        across runs; without one, clusters are numbered within this batch only.
+        """
+        if db is not None:
+            return NearDuplicateIndex(db).assign_clusters(articles)
         
+        hasher = get_min_hasher()
+        buckets = {}
+        signatures = {}
         for article in articles:
-            title_key = article.get('title', '')[:50].lower().strip()
+            signature = hasher.signature(NearDuplicateIndex.article_text(article))
+            keys = hasher.band_keys(signature)
+            candidates = {cid for key in keys for cid in buckets.get(key, ())}
+            matches = [
+                (hasher.similarity(signature, signatures[cid]), cid) for cid in candidates
+            ]
+            matches = [m for m in matches if m[0] >= NearDuplicateIndex.JACCARD_THRESHOLD]
             
-            if title_key in seen_titles:
-                # Potential duplicate - same title start
-                existing_cluster_id = seen_titles[title_key]
-                article['cluster_id'] = existing_cluster_id
+            if matches:
+                cluster_id = max(matches)[1]
                 article['is_duplicate'] = True
             else:
-                # New article
-                seen_titles[title_key] = cluster_id_counter
-                article['cluster_id'] = cluster_id_counter
+                cluster_id = len(signatures)
+                signatures[cluster_id] = signature
                 article['is_duplicate'] = False
-                cluster_id_counter += 1
-            
-            processed_articles.append(article)
+            article['cluster_id'] = cluster_id
+            for key in keys:
+                buckets.setdefault(key, set()).add(cluster_id)
         
-        return processed_articles
+        return articles
     
     def embedding_to_json(self, embedding) -> str:
         """Convert numpy array to JSON string"""
@@ -0,0 +1,199 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import os
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+from app.database import SessionLocal
+from app.services.news_extractor import NewsExtractor
+from app.services.content_parser import parse_article_html_async
+from app.services.search_index import index_articles
+from app.services.response_cache import get_response_cache, bump_shared_version
+from app.services.answer_cache import get_answer_cache
+
+# Set CONTENT_ENRICHMENT_ENABLED=false to keep RSS summaries as article content
+CONTENT_ENRICHMENT_ENABLED = os.getenv("CONTENT_ENRICHMENT_ENABLED", "true").lower() == "true"
+
+class ContentEnricher:
+    """Background stage that replaces stored RSS-summary content with full page text.
+    
+    New and changed articles are queued in the content_backlog table by the pipeline.
+    Pages are fetched concurrently through the extractor's per-host scheduler and parsed
+    in the worker process pool; failures are retried with exponential backoff.
+    """
+    
+    BATCH_SIZE = int(os.getenv("CONTENT_ENRICHMENT_BATCH_SIZE", "32"))
+    MAX_ATTEMPTS = int(os.getenv("CONTENT_ENRICHMENT_MAX_ATTEMPTS", "3"))
+    RETRY_DELAY = float(os.getenv("CONTENT_ENRICHMENT_RETRY_DELAY", "60"))  # Doubles per attempt
+    IDLE_INTERVAL = float(os.getenv("CONTENT_ENRICHMENT_IDLE_INTERVAL", "30"))
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        # Throughput counters since process start
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.bytes_parsed = 0
+        self.busy_seconds = 0.0
+        self.parse_seconds = 0.0
+    
+    @staticmethod
+    def enqueue(db: Session, article_ids: List[int]):
+        """(Re)queue articles for enrichment in the caller's transaction"""
+        ids = list(set(article_ids))
+        if not ids:
+            return
+        db.query(models.ContentTask).filter(
+            models.ContentTask.article_id.in_(ids)
+        ).delete(synchronize_session=False)
+        now = datetime.now()
+        db.bulk_insert_mappings(models.ContentTask, [
+            {"article_id": article_id, "status": "pending", "attempts": 0, "next_attempt_at": now}
+            for article_id in ids
+        ])
+    
+    async def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def wake(self):
+        """Start on the backlog now instead of at the next idle poll"""
+        if self._wake is not None:
+            self._wake.set()
+    
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                print(f"Content enrichment batch failed: {e}")
+                processed = 0
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.IDLE_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+    
+    async def run_once(self) -> int:
+        """Enrich one batch of due backlog entries, returning how many were attempted"""
+        batch = await asyncio.to_thread(self._due_batch)
+        if not batch:
+            return 0
+        
+        started = time.monotonic()
+        async with NewsExtractor() as extractor:
+            results = await asyncio.gather(
+                *(self._enrich(extractor, article_id, url) for article_id, url, _ in batch)
+            )
+        self.busy_seconds += time.monotonic() - started
+        
+        attempts = {article_id: attempts for article_id, _, attempts in batch}
+        await asyncio.to_thread(self._save, results, attempts)
+        return len(batch)
+    
+    async def _enrich(self, extractor: NewsExtractor, article_id: int, url: str) -> Tuple[int, Optional[str], Optional[str], int]:
+        """Fetch and parse one page: (article_id, content, error, bytes)"""
+        try:
+            async with extractor.scheduler.slot(url):
+                html = await extractor.fetch_article_html(url)
+            parse_started = time.monotonic()
+            content = await parse_article_html_async(html, url)
+            self.parse_seconds += time.monotonic() - parse_started
+            self.pages_fetched += 1
+            self.bytes_parsed += len(html)
+            return article_id, content, None, len(html)
+        except Exception as e:
+            self.pages_failed += 1
+            return article_id, None, f"{type(e).__name__}: {e}"[:500], 0
+    
+    def _due_batch(self) -> List[Tuple[int, str, int]]:
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                models.ContentTask.article_id, models.Article.source_url, models.ContentTask.attempts
+            ).join(
+                models.Article, models.Article.id == models.ContentTask.article_id
+            ).filter(
+                models.ContentTask.status == "pending",
+                models.ContentTask.next_attempt_at <= datetime.now()
+            ).order_by(models.ContentTask.next_attempt_at).limit(self.BATCH_SIZE).all()
+            return [(row[0], row[1], row[2] or 0) for row in rows]
+        finally:
+            db.close()
+    
+    def _save(self, results: List[Tuple[int, Optional[str], Optional[str], int]], attempts: Dict[int, int]):
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            enriched = []
+            for article_id, content, error, size in results:
+                task = db.get(models.ContentTask, article_id)
+                if task is None:
+                    continue
+                task.attempts = attempts[article_id] + 1
+                if error is None:
+                    task.status = "done"
+                    task.bytes_parsed = size
+                    task.last_error = None
+                    # Keep the RSS text when the page yields less (paywalls, script-rendered pages)
+                    article = db.get(models.Article, article_id)
+                    if article is not None and content and len(content) > len(article.content or ""):
+                        article.content = content
+                        enriched.append(article_id)
+                elif task.attempts >= self.MAX_ATTEMPTS:
+                    task.status = "failed"
+                    task.last_error = error
+                else:
+                    task.last_error = error
+                    task.next_attempt_at = now + timedelta(seconds=self.RETRY_DELAY * 2 ** (task.attempts - 1))
+            
+            db.flush()
+            index_articles(db, enriched)
+            if enriched:
+                bump_shared_version(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        if enriched:
+            get_response_cache().bump_version()
+            get_answer_cache().invalidate_articles(enriched)
+    
+    def metrics(self, db: Session) -> Dict:
+        """Backlog sizes plus fetch/parse throughput since process start"""
+        backlog = dict(
+            db.query(models.ContentTask.status, func.count(models.ContentTask.article_id))
+            .group_by(models.ContentTask.status).all()
+        )
+        return {
+            "enabled": CONTENT_ENRICHMENT_ENABLED,
+            "backlog": {status: backlog.get(status, 0) for status in ("pending", "done", "failed")},
+            "pages_fetched": self.pages_fetched,
+            "pages_failed": self.pages_failed,
+            "bytes_parsed": self.bytes_parsed,
+            "pages_per_second": round(self.pages_fetched / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            "bytes_per_second": round(self.bytes_parsed / self.busy_seconds) if self.busy_seconds else 0,
+            "parse_seconds": round(self.parse_seconds, 3)
+        }
+
+_enricher: Optional[ContentEnricher] = None
+
+def get_content_enricher() -> ContentEnricher:
+    """Process-wide content enrichment stage"""
+    global _enricher
+    if _enricher is None:
+        _enricher = ContentEnricher()
+    return _enricher
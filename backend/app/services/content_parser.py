@@ -0,0 +1,153 @@
+from typing import Callable, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import os
+import re
+import threading
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# Worker processes for HTML and feed parsing; parsing is CPU-bound, so keep it off the event loop
+PARSE_WORKERS = int(os.getenv("CONTENT_PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Longest article text kept per page
+MAX_CONTENT_LENGTH = 5000
+
+CONTENT_SELECTORS = [
+    'article',
+    '.article-body',
+    '.content',
+    '.post-content',
+    'main',
+    '[role="main"]'
+]
+
+# Subtrees that never hold article text
+SKIP_TAGS = ["script", "style", "nav", "footer", "header"]
+
+def _class_xpath(name: str) -> str:
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+# CONTENT_SELECTORS as precompiled XPath, in the same order
+CONTENT_XPATHS = {
+    'article': etree.XPath("//article"),
+    '.article-body': etree.XPath(_class_xpath("article-body")),
+    '.content': etree.XPath(_class_xpath("content")),
+    '.post-content': etree.XPath(_class_xpath("post-content")),
+    'main': etree.XPath("//main"),
+    '[role="main"]': etree.XPath("//*[@role='main']"),
+}
+
+WHITESPACE = re.compile(r'\s+')
+
+_html_parser = etree.HTMLParser(remove_comments=True, remove_pis=True)
+
+def clean_text(content: str) -> str:
+    return WHITESPACE.sub(' ', content).strip()[:MAX_CONTENT_LENGTH]
+
+def parse_article_html(html: str, selector_hint: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Extract the main article text from a page with lxml.
+    
+    Unwanted subtrees are stripped in C and CONTENT_SELECTORS are tried as precompiled
+    XPath; selector_hint (the selector that worked for this site before) is tried first.
+    Returns the text and the selector that matched (None for the body-text fallback).
+    Module-level (and free of app imports) so it can run in a worker process.
+    """
+    try:
+        root = etree.fromstring(html, _html_parser)
+    except (etree.ParserError, ValueError):
+        root = None
+    if root is None:
+        return parse_article_html_soup(html), None
+    
+    etree.strip_elements(root, *SKIP_TAGS, with_tail=False)
+    
+    order = CONTENT_SELECTORS
+    if selector_hint in CONTENT_XPATHS:
+        order = [selector_hint] + [s for s in CONTENT_SELECTORS if s != selector_hint]
+    
+    for selector in order:
+        elements = CONTENT_XPATHS[selector](root)
+        if elements:
+            content = clean_text(' '.join(''.join(elem.itertext()) for elem in elements))
+            if content:
+                return content, selector
+    
+    # Fallback to the whole document's text
+    return clean_text(''.join(root.itertext())), None
+
+def parse_article_html_soup(html: str) -> str:
+    """Original BeautifulSoup extractor - fallback for documents lxml can't parse, and the
+    baseline in benchmarks/content_extraction.py"""
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Remove script and style elements
+    for script in soup(SKIP_TAGS):
+        script.decompose()
+    
+    # Try to find main content
+    content = ""
+    for selector in CONTENT_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            content = ' '.join([elem.get_text() for elem in elements])
+            break
+    
+    # Fallback to body text
+    if not content:
+        content = soup.get_text()
+    
+    return clean_text(content)
+
+# Site (host) -> selector that last matched there; kept in the parent process and passed
+# to workers as a hint, since pages are spread across worker processes
+_selector_memo: Dict[str, Optional[str]] = {}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Process-wide parser pool, started on first use.
+    
+    Workers are spawned rather than forked: the server process runs threads (embedding
+    worker, executors) that are unsafe to fork.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+def shutdown_parse_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+async def run_in_parse_pool(func: Callable, *args):
+    """Run a module-level parse function in the worker pool, awaitable from the event loop"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_parse_pool(), func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge page); the next call starts a fresh pool
+        shutdown_parse_pool()
+        raise
+
+async def parse_article_html_async(html: str, url: Optional[str] = None) -> str:
+    """parse_article_html in the worker pool.
+    
+    With url, the selector that matched for its site is remembered and tried first next time.
+    """
+    source = urlparse(url).netloc if url else None
+    content, selector = await run_in_parse_pool(parse_article_html, html, _selector_memo.get(source))
+    if source and selector:
+        _selector_memo[source] = selector
+    return content
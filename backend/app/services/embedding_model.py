@@ -0,0 +1,31 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# One SentenceTransformer per process, shared by the categorizer, RAG and the embedding worker
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None  # e.g. "cpu", "cuda"; None lets the library pick
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 keeps the torch default
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "false").lower() == "true"
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_embedding_model():
+    """Load the shared embedding model on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                if EMBEDDING_THREADS > 0:
+                    import torch
+                    torch.set_num_threads(EMBEDDING_THREADS)
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=EMBEDDING_DEVICE)
+    return _model
+
+def warm_up():
+    """Load the model and run one encode so the first real request doesn't pay for it"""
+    get_embedding_model().encode(["warm up"])
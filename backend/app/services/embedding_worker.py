@@ -0,0 +1,165 @@
+from typing import List, Dict, Optional, Set, Tuple
+import os
+import queue
+import threading
+import time
+from app import models
+from app.database import SessionLocal
+from app.services.categorizer import NewsCategorizer
+from app.services.rag_service import RAGService
+from app.services.vector_index import get_vector_index
+
+class EmbeddingWorker:
+    """Embed articles in micro-batches on a dedicated thread and write vectors in bulk.
+    
+    The queue is in memory, so the database is the source of truth: on start and whenever
+    the worker has been idle for SWEEP_INTERVAL, articles without a stored embedding are
+    queued again. Failed batches are retried with backoff before being left to the sweep.
+    """
+    
+    BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    MAX_BATCH_WAIT = float(os.getenv("EMBEDDING_BATCH_WAIT", "0.5"))  # Seconds to fill a batch
+    SWEEP_INTERVAL = float(os.getenv("EMBEDDING_SWEEP_INTERVAL", "300"))
+    SWEEP_LIMIT = int(os.getenv("EMBEDDING_SWEEP_LIMIT", "1000"))  # Articles queued per sweep
+    MAX_ATTEMPTS = int(os.getenv("EMBEDDING_MAX_ATTEMPTS", "3"))
+    RETRY_DELAY = float(os.getenv("EMBEDDING_RETRY_DELAY", "5"))  # Doubles per attempt
+    
+    def __init__(self, batch_size: Optional[int] = None, max_batch_wait: Optional[float] = None):
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.max_batch_wait = max_batch_wait if max_batch_wait is not None else self.MAX_BATCH_WAIT
+        self.categorizer = NewsCategorizer()
+        self.vector_index = get_vector_index(RAGService.EMBEDDING_MODEL_NAME)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._queued: Set[int] = set()  # Article ids waiting in the queue
+        self.embedded_count = 0
+        self.failed_count = 0
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-worker", daemon=True)
+                self._thread.start()
+    
+    def submit(self, articles: List[Dict]):
+        """Queue articles (dicts with id, title, summary) for embedding"""
+        items = [(art["id"], RAGService.article_text(art), 0) for art in articles if art.get("id")]
+        if not items:
+            return
+        self.start()
+        self._put(items)
+    
+    def _put(self, items: List[Tuple[int, str, int]]):
+        with self._lock:
+            self._queued.update(article_id for article_id, _, _ in items)
+        for item in items:
+            self._queue.put(item)
+    
+    def sweep(self) -> int:
+        """Queue stored articles that have no embedding for this model, returning how many"""
+        with self._lock:
+            queued = set(self._queued)
+        db = SessionLocal()
+        try:
+            rows = db.query(models.Article.id, models.Article.title, models.Article.summary).outerjoin(
+                models.ArticleEmbedding,
+                (models.ArticleEmbedding.article_id == models.Article.id)
+                & (models.ArticleEmbedding.model == self.vector_index.model_name)
+            ).filter(
+                models.ArticleEmbedding.article_id.is_(None)
+            ).order_by(models.Article.id.desc()).limit(self.SWEEP_LIMIT + len(queued)).all()
+        finally:
+            db.close()
+        items = [
+            (row.id, RAGService.article_text({"title": row.title, "summary": row.summary}), 0)
+            for row in rows if row.id not in queued
+        ][:self.SWEEP_LIMIT]
+        self._put(items)
+        return len(items)
+    
+    def pending(self) -> int:
+        return self._queue.qsize()
+    
+    def _next_batch(self) -> List:
+        """Wait for the first item, then collect until the batch is full or the wait runs out.
+        
+        Returns an empty batch when nothing arrived within SWEEP_INTERVAL.
+        """
+        try:
+            batch = [self._queue.get(timeout=self.SWEEP_INTERVAL)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        sweep_due = True  # Catch up on articles stored before start / lost on restart
+        swept = 0
+        while True:
+            if sweep_due:
+                try:
+                    swept = self.sweep()
+                except Exception as e:
+                    print(f"Error sweeping for unembedded articles: {e}")
+                    swept = 0
+            batch = self._next_batch()
+            # Sweep again when idle, or straight away while a large backlog is draining
+            sweep_due = not batch or (swept >= self.SWEEP_LIMIT and self._queue.empty())
+            if not batch:
+                continue
+            with self._lock:
+                self._queued.difference_update(article_id for article_id, _, _ in batch)
+            try:
+                self._process(batch)
+            except Exception as e:
+                self._retry(batch, e)
+    
+    def _retry(self, batch: List, error: Exception):
+        """Re-queue a failed batch after a backoff; articles out of attempts wait for the sweep"""
+        attempts = max(item[2] for item in batch) + 1
+        retry = [(article_id, text, attempts) for article_id, text, _ in batch]
+        if attempts >= self.MAX_ATTEMPTS:
+            self.failed_count += len(batch)
+            print(f"Error embedding batch of {len(batch)} articles, giving up until the next sweep: {error}")
+            return
+        print(f"Error embedding batch of {len(batch)} articles (attempt {attempts}), retrying: {error}")
+        time.sleep(self.RETRY_DELAY * 2 ** (attempts - 1))
+        self._put(retry)
+    
+    def _process(self, batch: List):
+        # Last submission wins when an article is queued more than once
+        latest = {article_id: text for article_id, text, _ in batch}
+        ids = list(latest)
+        vectors = self.categorizer.generate_embeddings(list(latest.values()), batch_size=self.batch_size)
+        
+        db = SessionLocal()
+        try:
+            self.vector_index.ensure_loaded(db)
+            self.vector_index.save(db, ids, vectors)
+            db.commit()
+            self.embedded_count += len(ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+_worker: Optional[EmbeddingWorker] = None
+_worker_lock = threading.Lock()
+
+def get_embedding_worker() -> EmbeddingWorker:
+    """Process-wide embedding worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = EmbeddingWorker()
+        return _worker
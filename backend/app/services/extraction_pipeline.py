@@ -0,0 +1,170 @@
+from typing import List, Dict, Optional, Callable
+from datetime import datetime
+import asyncio
+import os
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.services.news_extractor import NewsExtractor
+from app.services.feed_cache import FeedCacheStore
+from app.services.source_health import SourceHealthStore
+from app.services.article_store import ArticleStore
+from app.services.categorizer import NewsCategorizer
+from app.services.highlights_processor import HighlightsProcessor
+from app.services.embedding_worker import get_embedding_worker
+from app.services.response_cache import get_response_cache, bump_shared_version
+from app.services.answer_cache import get_answer_cache
+from app.services.search_index import index_articles
+from app.services.content_enricher import get_content_enricher, CONTENT_ENRICHMENT_ENABLED
+
+# Set EMBEDDINGS_ENABLED=false on memory-constrained hosts to skip article embeddings
+EMBEDDINGS_ENABLED = os.getenv("EMBEDDINGS_ENABLED", "true").lower() == "true"
+
+class ExtractionPipeline:
+    """One extraction run: fetch feeds, cluster, store articles and merge highlights.
+    
+    Fetching runs on the event loop; the database stage runs in a worker thread with
+    its own session so the loop is never blocked by SQL.
+    """
+    
+    # Upper bound on the fetch stage; per-feed timeouts normally finish well before this
+    FETCH_TIMEOUT = float(os.getenv("EXTRACTION_FETCH_TIMEOUT", "120"))
+    
+    def __init__(self, categories: List[str], force_refresh: bool = False,
+                 max_entries_per_feed: Optional[int] = None,
+                 on_feed_done: Optional[Callable[[str, Dict], None]] = None):
+        self.categories = categories
+        self.force_refresh = force_refresh
+        self.max_entries_per_feed = max_entries_per_feed
+        self.on_feed_done = on_feed_done
+        self.source_timings: Dict[str, Dict] = {}
+    
+    async def run(self) -> Dict:
+        """Run the pipeline, returning message and article/duplicate/highlight counts"""
+        db = SessionLocal()
+        try:
+            feed_cache = FeedCacheStore(db)
+            await asyncio.to_thread(feed_cache.preload)
+            # Health rows share this session, so they are committed with the run
+            source_health = SourceHealthStore(db, max_timeout=NewsExtractor.FEED_TIMEOUT)
+            await asyncio.to_thread(source_health.preload)
+            
+            extractor = NewsExtractor(
+                feed_cache=feed_cache,
+                entry_budget=self.max_entries_per_feed,
+                on_feed_done=self.on_feed_done,
+                source_health=source_health
+            )
+            async with extractor:
+                try:
+                    articles_data = await asyncio.wait_for(
+                        extractor.extract_all_articles(self.categories),
+                        timeout=self.FETCH_TIMEOUT
+                    )
+                except Exception:
+                    # Keep what was learned about the sources even when the run fails
+                    await asyncio.to_thread(source_health.save)
+                    raise
+                finally:
+                    self.source_timings = extractor.source_timings
+            
+            result = await asyncio.to_thread(self.store, db, feed_cache, articles_data)
+            # Fetch full page text for the articles just stored
+            get_content_enricher().wake()
+            return result
+        finally:
+            db.close()
+    
+    def store(self, db: Session, feed_cache: FeedCacheStore, articles_data: List[Dict]) -> Dict:
+        """Cluster, upsert and highlight extracted articles in a single transaction"""
+        if not articles_data:
+            # Still persist validators so unchanged feeds keep returning 304
+            feed_cache.save()
+            return {
+                "message": "No new articles extracted - RSS feeds may be unchanged or unavailable",
+                "articles_extracted": 0,
+                "duplicates_found": 0,
+                "highlights_created": 0
+            }
+        
+        try:
+            # Drop repeated URLs (feeds shared between categories), then cluster near-duplicates
+            seen_urls = set()
+            unique_articles = []
+            for article in articles_data:
+                url = article.get("source_url", "")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    unique_articles.append(article)
+            
+            # MinHash/LSH clustering with stable, persistent cluster ids
+            articles_data = NewsCategorizer().detect_duplicates(unique_articles, db)
+            
+            # Process articles - use RSS summaries; embeddings are computed by the background worker
+            article_rows = []
+            for article_data in articles_data:
+                # Use RSS summary if available, otherwise use title
+                summary = article_data.get("summary", "")
+                if not summary or len(summary) < 30:
+                    summary = article_data.get("title", "") + " - " + article_data.get("source", "Unknown")
+                
+                article_rows.append({
+                    **article_data,
+                    "summary": summary[:1000],
+                    "extracted_date": datetime.now()
+                })
+            
+            # One IN lookup plus one bulk upsert for the whole batch
+            processed_articles, articles_created = ArticleStore(db).upsert_articles(
+                article_rows, force_refresh=self.force_refresh
+            )
+            duplicates_count = sum(1 for art in article_rows if art.get("is_duplicate", False))
+            
+            # Keep the full-text index in step with the rows written above
+            changed_ids = [art["id"] for art in processed_articles if art.get("changed") and art.get("id")]
+            index_articles(db, changed_ids)
+            
+            # Queue new and changed articles for full-content enrichment
+            if CONTENT_ENRICHMENT_ENABLED:
+                get_content_enricher().enqueue(db, changed_ids)
+            
+            # Merge into existing highlights - only clusters touched by this batch are recomputed
+            articles_for_highlights = [
+                {
+                    "id": art["id"],
+                    "title": art["title"],
+                    "summary": art.get("summary") or "",
+                    "category": art["category"],
+                    "source": art["source"],
+                    "author": art.get("author") or "Unknown",
+                    "cluster_id": art.get("cluster_id")
+                }
+                for art in processed_articles if art.get("id")
+            ]
+            highlights_processor = HighlightsProcessor()
+            highlights_created, _ = highlights_processor.update_highlights(db, articles_for_highlights)
+            highlights_processor.refresh_category_stats(db)
+            
+            # Single commit for articles, highlights, feed cache and high-water marks;
+            # the shared version bump tells other worker processes to drop cached responses
+            bump_shared_version(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        # Cached highlight/article responses are stale now, as are chat answers built on changed articles
+        get_response_cache().bump_version()
+        get_answer_cache().invalidate_articles(
+            [art["id"] for art in processed_articles if art.get("changed") and art.get("id")]
+        )
+        
+        # Embed new and changed articles in micro-batches off the request path
+        if EMBEDDINGS_ENABLED:
+            get_embedding_worker().submit([art for art in processed_articles if art.get("changed")])
+        
+        return {
+            "message": "News extraction completed successfully",
+            "articles_extracted": articles_created,
+            "duplicates_found": duplicates_count,
+            "highlights_created": highlights_created
+        }
@@ -0,0 +1,111 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timezone
+import calendar
+import json
+from sqlalchemy.orm import Session
+from app import models
+
+class FeedCacheStore:
+    """Per-feed HTTP cache (ETag, Last-Modified, body hash, parsed entries) and
+    per-source high-water marks"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self._rows: Optional[Dict[str, models.FeedCache]] = None
+        self._marks: Optional[Dict[Tuple[str, str], models.FeedMark]] = None
+    
+    def _load(self) -> Dict[str, models.FeedCache]:
+        """Load every cached feed in one query on first use"""
+        if self._rows is None:
+            self._rows = {row.rss_url: row for row in self.db.query(models.FeedCache).all()}
+        return self._rows
+    
+    def _load_marks(self) -> Dict[Tuple[str, str], models.FeedMark]:
+        if self._marks is None:
+            self._marks = {(row.rss_url, row.source): row for row in self.db.query(models.FeedMark).all()}
+        return self._marks
+    
+    def preload(self):
+        """Load the cache up front (e.g. from a worker thread) so lookups never hit the DB"""
+        self._load()
+        self._load_marks()
+    
+    def get(self, rss_url: str) -> Optional[models.FeedCache]:
+        return self._load().get(rss_url)
+    
+    def conditional_headers(self, rss_url: str) -> Dict[str, str]:
+        """Validators to send with the next request for this feed"""
+        headers = {}
+        row = self.get(rss_url)
+        if row:
+            if row.etag:
+                headers["If-None-Match"] = row.etag
+            if row.last_modified:
+                headers["If-Modified-Since"] = row.last_modified
+        return headers
+    
+    def cached_entries(self, rss_url: str) -> List[Dict]:
+        row = self.get(rss_url)
+        if not row or not row.entries:
+            return []
+        return json.loads(row.entries)
+    
+    def mark_unchanged(self, rss_url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Record a 304 / identical body, refreshing validators if the server sent new ones"""
+        row = self.get(rss_url)
+        if not row:
+            return
+        if etag:
+            row.etag = etag
+        if last_modified:
+            row.last_modified = last_modified
+        row.checked_date = datetime.now()
+    
+    def store(self, rss_url: str, etag: Optional[str], last_modified: Optional[str],
+              body_hash: str, entries: List[Dict]):
+        """Record a freshly parsed feed body"""
+        rows = self._load()
+        row = rows.get(rss_url)
+        if row is None:
+            row = models.FeedCache(rss_url=rss_url)
+            self.db.add(row)
+            rows[rss_url] = row
+        now = datetime.now()
+        row.etag = etag
+        row.last_modified = last_modified
+        row.body_hash = body_hash
+        row.entries = json.dumps(entries)
+        row.fetched_date = now
+        row.checked_date = now
+    
+    def high_water_mark(self, rss_url: str, source: str) -> Tuple[Optional[str], Optional[float]]:
+        """Newest entry this source ingested from the feed as (entry id, published UTC timestamp)"""
+        row = self._load_marks().get((rss_url, source))
+        if not row or not row.last_entry_id:
+            return None, None
+        published_ts = None
+        if row.last_published:
+            published_ts = float(calendar.timegm(row.last_published.utctimetuple()))
+        return row.last_entry_id, published_ts
+    
+    def advance(self, rss_url: str, source: str, entry_id: str, published_ts: Optional[float]):
+        """Move the source's high-water mark for the feed forward to entry_id"""
+        marks = self._load_marks()
+        row = marks.get((rss_url, source))
+        if row is None:
+            row = models.FeedMark(rss_url=rss_url, source=source)
+            self.db.add(row)
+            marks[(rss_url, source)] = row
+        row.last_entry_id = entry_id
+        row.last_published = (
+            datetime.fromtimestamp(published_ts, timezone.utc).replace(tzinfo=None)
+            if published_ts is not None else None
+        )
+    
+    def save(self):
+        """Persist cache updates from this run"""
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error saving feed cache: {e}")
@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import calendar
+import feedparser
+
+def parse_feed_entries(content: bytes) -> List[Dict]:
+    """Parse an RSS document into plain entry dicts, in feed order.
+    
+    Module-level (and free of app imports) so it can run in the parser worker pool.
+    """
+    feed = feedparser.parse(content)
+    
+    articles = []
+    for entry in feed.entries:
+        published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        article = {
+            "id": entry.get("id", "") or entry.get("link", ""),
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": entry.get("published", ""),
+            "published_ts": float(calendar.timegm(published_parsed)) if published_parsed else None,
+            "summary": entry.get("summary", "") or entry.get("description", ""),
+            "author": entry.get("author", "") or entry.get("dc:creator", "") or "Unknown",
+        }
+        articles.append(article)
+    
+    return articles
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware datetimes converted to UTC; naive ones are taken to be UTC already"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@lru_cache(maxsize=4096)
+def _parse_absolute_date(date_str: str) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO 8601 (Atom) date as naive UTC, memoized since the same dates
+    are seen on every run of a feed"""
+    try:
+        return to_naive_utc(parsedate_to_datetime(date_str))
+    except (TypeError, ValueError, IndexError):
+        pass
+    
+    try:
+        return to_naive_utc(datetime.fromisoformat(date_str.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+def parse_date_string(date_str: str) -> Optional[datetime]:
+    """Parse a feed date as naive UTC, or None if it can't be parsed.
+    
+    RSS and Atom dates are handled by the stdlib in microseconds; only other formats
+    reach dateparser. Its results are not cached, since they may be relative ("2 hours ago").
+    """
+    date_str = (date_str or "").strip()
+    if not date_str:
+        return None
+    
+    parsed = _parse_absolute_date(date_str)
+    if parsed is not None:
+        return parsed
+    
+    try:
+        from dateparser import parse
+        return to_naive_utc(parse(date_str, settings={"TO_TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": False}))
+    except Exception:
+        return None
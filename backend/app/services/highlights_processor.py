@@ -1,23 +1,27 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app import models
+from app.services.keyword_matcher import get_keyword_matcher, KeywordHits
 import re
 
 class HighlightsProcessor:
     """Process articles into highlights based on frequency and keywords"""
     
-    BREAKING_KEYWORDS = [
-        "breaking", "urgent", "alert", "just in", "developing", 
-        "live", "exclusive", "major", "significant", "critical"
-    ]
+    def __init__(self):
+        self.matcher = get_keyword_matcher()
+        self.BREAKING_KEYWORDS = self.matcher.rules["breaking"]
+        self.IMPORTANT_KEYWORDS = self.matcher.rules["important"]
     
-    IMPORTANT_KEYWORDS = [
-        "announcement", "decision", "reveals", "unveils", "launches",
-        "wins", "victory", "defeats", "championship", "record", "historic"
-    ]
+    def scan_article(self, article: Dict) -> KeywordHits:
+        """Match all keyword rules against the article's title and summary in one pass"""
+        return self.matcher.scan(article.get("title", "") + " " + article.get("summary", ""))
     
-    def calculate_priority_score(self, article: Dict, frequency: int) -> float:
+    def calculate_priority_score(self, article: Dict, frequency: int, hits: Optional[KeywordHits] = None) -> float:
         """Calculate priority score based on keywords and frequency"""
-        text = (article.get("title", "") + " " + article.get("summary", "")).lower()
+        hits = hits or self.scan_article(article)
         
         score = 0.0
         
@@ -25,19 +29,17 @@ class HighlightsProcessor:
         score += frequency * 10
         
         # Breaking news keywords
-        breaking_count = sum(1 for keyword in self.BREAKING_KEYWORDS if keyword in text)
-        score += breaking_count * 50
+        score += hits.count("breaking") * 50
         
         # Important keywords
-        important_count = sum(1 for keyword in self.IMPORTANT_KEYWORDS if keyword in text)
-        score += important_count * 20
+        score += hits.count("important") * 20
         
         return score
     
-    def is_breaking_news(self, article: Dict) -> bool:
+    def is_breaking_news(self, article: Dict, hits: Optional[KeywordHits] = None) -> bool:
         """Check if article is breaking news"""
-        text = (article.get("title", "") + " " + article.get("summary", "")).lower()
-        return any(keyword in text for keyword in self.BREAKING_KEYWORDS)
+        hits = hits or self.scan_article(article)
+        return hits.count("breaking") > 0
     
     def create_highlights(self, articles: List[Dict]) -> List[Dict]:
         """Create highlights from articles grouped by cluster"""
@@ -69,13 +71,15 @@ class HighlightsProcessor:
             # Calculate frequency (number of sources)
             frequency = len(sources)
             
-            # Calculate priority score
-            priority_score = self.calculate_priority_score(primary_article, frequency)
+            # Calculate priority score and breaking flag from a single keyword scan
+            hits = self.scan_article(primary_article)
+            priority_score = self.calculate_priority_score(primary_article, frequency, hits)
             
             # Check if breaking news
-            is_breaking = self.is_breaking_news(primary_article)
+            is_breaking = self.is_breaking_news(primary_article, hits)
             
             highlight = {
+                "cluster_id": cluster_id,
                 "article_id": primary_article.get("id"),
                 "title": primary_article.get("title"),
                 "summary": primary_article.get("summary", ""),
@@ -95,10 +99,12 @@ class HighlightsProcessor:
             authors = [article.get("author", "Unknown")] if article.get("author") else []
             frequency = 1
             
-            priority_score = self.calculate_priority_score(article, frequency)
-            is_breaking = self.is_breaking_news(article)
+            hits = self.scan_article(article)
+            priority_score = self.calculate_priority_score(article, frequency, hits)
+            is_breaking = self.is_breaking_news(article, hits)
             
             highlight = {
+                "cluster_id": None,
                 "article_id": article.get("id"),
                 "title": article.get("title"),
                 "summary": article.get("summary", ""),
@@ -117,3 +123,114 @@ class HighlightsProcessor:
         
         return highlights
 
+    
+    def update_highlights(self, db: Session, articles: List[Dict]) -> Tuple[int, int]:
+        """Merge new articles into existing highlights without rebuilding the table.
+        
+        Only the clusters touched by `articles` are recomputed, from all of their stored
+        members. Matching highlights have frequency, sources, authors, priority_score and
+        is_breaking updated in place; clusters without a highlight get a new one. Nothing
+        is committed here so the caller can apply the whole run in one transaction.
+        Returns (created, updated) counts.
+        """
+        cluster_ids = {a["cluster_id"] for a in articles if a.get("cluster_id") is not None}
+        unclustered = [a for a in articles if a.get("cluster_id") is None]
+        
+        # Every stored member of the affected clusters, oldest first so the primary is stable
+        members = []
+        if cluster_ids:
+            rows = db.query(
+                models.Article.id, models.Article.title, models.Article.summary,
+                models.Article.category, models.Article.source, models.Article.author,
+                models.Article.cluster_id
+            ).filter(
+                models.Article.cluster_id.in_(cluster_ids)
+            ).order_by(models.Article.id).all()
+            members = [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "summary": row.summary or "",
+                    "category": row.category,
+                    "source": row.source,
+                    "author": row.author or "Unknown",
+                    "cluster_id": row.cluster_id
+                }
+                for row in rows
+            ]
+        
+        # Existing highlights for those clusters (via their primary article) and unclustered articles
+        existing_by_cluster = {}
+        if cluster_ids:
+            for highlight, cluster_id in db.query(models.Highlight, models.Article.cluster_id).join(
+                models.Article, models.Highlight.article_id == models.Article.id
+            ).filter(models.Article.cluster_id.in_(cluster_ids)):
+                existing_by_cluster.setdefault(cluster_id, highlight)
+        
+        existing_by_article = {}
+        unclustered_ids = [a["id"] for a in unclustered if a.get("id")]
+        if unclustered_ids:
+            for highlight in db.query(models.Highlight).filter(
+                models.Highlight.article_id.in_(unclustered_ids)
+            ):
+                existing_by_article[highlight.article_id] = highlight
+        
+        created = 0
+        updated = 0
+        for highlight_data in self.create_highlights(members + unclustered):
+            if highlight_data["cluster_id"] is not None:
+                highlight = existing_by_cluster.get(highlight_data["cluster_id"])
+            else:
+                highlight = existing_by_article.get(highlight_data["article_id"])
+            
+            if highlight is not None:
+                highlight.frequency = highlight_data["frequency"]
+                highlight.priority_score = highlight_data["priority_score"]
+                highlight.sources = ",".join(highlight_data["sources"])
+                highlight.authors = ",".join(highlight_data["authors"])
+                highlight.is_breaking = highlight_data["is_breaking"]
+                updated += 1
+            else:
+                db.add(models.Highlight(
+                    article_id=highlight_data["article_id"],
+                    title=highlight_data["title"],
+                    summary=highlight_data["summary"],
+                    category=highlight_data["category"],
+                    frequency=highlight_data["frequency"],
+                    priority_score=highlight_data["priority_score"],
+                    sources=",".join(highlight_data["sources"]),
+                    authors=",".join(highlight_data["authors"]),
+                    is_breaking=highlight_data["is_breaking"]
+                ))
+                created += 1
+        
+        return created, updated
+    
+    @staticmethod
+    def category_aggregates(db: Session):
+        """Per-category highlight count, breaking count and max priority in one GROUP BY"""
+        return db.query(
+            models.Highlight.category,
+            func.count(models.Highlight.id),
+            func.sum(case((models.Highlight.is_breaking == True, 1), else_=0)),
+            func.max(models.Highlight.priority_score)
+        ).group_by(models.Highlight.category).all()
+    
+    def refresh_category_stats(self, db: Session):
+        """Rebuild the category_stats summary from one aggregate query (caller commits)"""
+        db.flush()
+        now = datetime.now()
+        rows = [
+            {
+                "category": category,
+                "highlight_count": count,
+                "breaking_count": breaking or 0,
+                "max_priority": max_priority or 0.0,
+                "last_updated": now
+            }
+            for category, count, breaking, max_priority in self.category_aggregates(db)
+            if category is not None
+        ]
+        db.query(models.CategoryStat).delete(synchronize_session=False)
+        if rows:
+            db.bulk_insert_mappings(models.CategoryStat, rows)
@@ -0,0 +1,62 @@
+from typing import Optional
+import os
+import aiohttp
+
+# Connection pool for outbound fetches (feeds and article pages)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "4"))  # >= EXTRACTOR_PER_HOST_LIMIT
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "75"))  # Seconds an idle connection is kept
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "600"))  # Seconds a resolved host is cached
+
+USER_AGENT = os.getenv("HTTP_USER_AGENT", "NewsPaper/1.0 (news aggregator)")
+
+try:
+    # aiohttp only decodes brotli bodies when one of these is installed
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+def create_http_session() -> aiohttp.ClientSession:
+    """ClientSession over a tuned connector: keep-alive, per-host limits and a DNS cache.
+    
+    Must be created (and closed) on the event loop that uses it.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=HTTP_DNS_TTL
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT}
+    )
+
+_session: Optional[aiohttp.ClientSession] = None
+
+async def start_http_session() -> aiohttp.ClientSession:
+    """Open the app-lifetime session (called from the FastAPI lifespan)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = create_http_session()
+    return _session
+
+async def close_http_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+def get_http_session() -> Optional[aiohttp.ClientSession]:
+    """The shared session, or None outside the server (scripts, benchmarks)"""
+    if _session is None or _session.closed:
+        return None
+    return _session
@@ -0,0 +1,298 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app import models
+from app.database import SessionLocal
+from app.services.news_extractor import NewsExtractor
+from app.services.extraction_pipeline import ExtractionPipeline
+
+ACTIVE_STATUSES = ("pending", "running")
+
+def parse_schedule(value: str) -> Dict[str, float]:
+    """Parse EXTRACTION_SCHEDULE, e.g. "sports=300,music=600" (seconds per category)"""
+    schedule = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        category, seconds = part.split("=", 1)
+        try:
+            if float(seconds) > 0:
+                schedule[category.strip()] = float(seconds)
+        except ValueError:
+            print(f"Invalid extraction interval for {category}: {seconds}")
+    return schedule
+
+class JobScheduler:
+    """In-process asyncio scheduler for extraction jobs backed by the extraction_jobs table.
+    
+    Jobs run one at a time in the background; a request for categories already covered
+    by a pending or running job returns that job instead of starting another.
+    
+    Several worker processes can share the table: each job records its owner process,
+    which refreshes the job's heartbeat while it is active, and only jobs whose heartbeat
+    is older than STALE_AFTER are failed as interrupted. The periodic schedule runs in
+    whichever process holds the "extraction_schedule" lease.
+    """
+    
+    SCHEDULE = parse_schedule(os.getenv("EXTRACTION_SCHEDULE", ""))
+    HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"))  # Seconds
+    STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "60"))  # Also the schedule lease length
+    SCHEDULE_LEASE = "extraction_schedule"
+    
+    def __init__(self, schedule: Optional[Dict[str, float]] = None):
+        self.schedule = self.SCHEDULE if schedule is None else schedule
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._next_run: Dict[str, float] = {}
+        self._run_lock: Optional[asyncio.Lock] = None
+        self._submit_lock: Optional[asyncio.Lock] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._periodic: List[asyncio.Task] = []
+    
+    def _locks(self):
+        if self._run_lock is None:
+            self._run_lock = asyncio.Lock()
+            self._submit_lock = asyncio.Lock()
+        return self._run_lock, self._submit_lock
+    
+    async def start(self):
+        """Start heartbeats, reaping of abandoned jobs and periodic extraction"""
+        self._periodic.append(asyncio.create_task(self._maintain()))
+    
+    async def stop(self):
+        tasks = self._periodic + list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._periodic = []
+        self._tasks = {}
+        # Hand over promptly rather than leaving our jobs and lease to expire
+        await asyncio.to_thread(self._release)
+    
+    async def _maintain(self):
+        """Heartbeat this process's jobs, reap stale ones and run the schedule if we hold the lease"""
+        while True:
+            try:
+                await asyncio.to_thread(self._heartbeat)
+                await asyncio.to_thread(self._fail_stale_jobs)
+                if self.schedule and await asyncio.to_thread(self._acquire_lease, self.SCHEDULE_LEASE):
+                    await self._run_due()
+                else:
+                    # Whoever takes over later starts its own intervals afresh
+                    self._next_run = {}
+            except Exception as e:
+                print(f"Error maintaining extraction jobs: {e}")
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+    
+    async def _run_due(self):
+        now = time.monotonic()
+        for category, interval in self.schedule.items():
+            if now < self._next_run.get(category, 0.0):
+                continue
+            self._next_run[category] = now + interval
+            try:
+                await self.submit([category], trigger="scheduled")
+            except Exception as e:
+                print(f"Error scheduling extraction for {category}: {e}")
+    
+    async def submit(self, categories: List[str], force_refresh: bool = False,
+                     max_entries_per_feed: Optional[int] = None, trigger: str = "manual") -> Tuple[models.ExtractionJob, bool]:
+        """Queue an extraction job, or return an active job that already covers these categories.
+        
+        Returns the job and whether it was newly created.
+        """
+        _, submit_lock = self._locks()
+        async with submit_lock:
+            job, created = await asyncio.to_thread(
+                self._find_or_create, categories, force_refresh, max_entries_per_feed, trigger
+            )
+            if created:
+                self._tasks[job.id] = asyncio.create_task(
+                    self._execute(job.id, categories, force_refresh, max_entries_per_feed)
+                )
+            return job, created
+    
+    def _find_or_create(self, categories: List[str], force_refresh: bool,
+                        max_entries_per_feed: Optional[int], trigger: str) -> Tuple[models.ExtractionJob, bool]:
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            for job in db.query(models.ExtractionJob).filter(
+                models.ExtractionJob.status.in_(ACTIVE_STATUSES),
+                models.ExtractionJob.heartbeat_at >= now - timedelta(seconds=self.STALE_AFTER)
+            ):
+                # Same budget, covering the categories, and at least as thorough (a forced
+                # refresh never attaches to a normal run)
+                if (
+                    set(categories) <= set(json.loads(job.categories or "[]"))
+                    and job.max_entries_per_feed == max_entries_per_feed
+                    and (job.force_refresh or not force_refresh)
+                ):
+                    db.expunge(job)
+                    return job, False
+            
+            sources_total = len({
+                source["rss"]
+                for category in categories
+                for source in NewsExtractor.NEWS_SOURCES.get(category, [])
+            })
+            job = models.ExtractionJob(
+                status="pending",
+                trigger=trigger,
+                categories=json.dumps(categories),
+                force_refresh=force_refresh,
+                max_entries_per_feed=max_entries_per_feed,
+                sources_total=sources_total,
+                sources_done=0,
+                source_timings="{}",
+                owner=self.owner,
+                heartbeat_at=now
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            db.expunge(job)
+            return job, True
+        finally:
+            db.close()
+    
+    async def _execute(self, job_id: int, categories: List[str], force_refresh: bool,
+                       max_entries_per_feed: Optional[int]):
+        run_lock, _ = self._locks()
+        try:
+            async with run_lock:
+                await asyncio.to_thread(self._update, job_id, status="running", started_date=datetime.now())
+                
+                timings: Dict[str, Dict] = {}
+                progress_writes = set()
+                
+                def on_feed_done(rss_url: str, timing: Dict):
+                    timings[rss_url] = timing
+                    task = asyncio.create_task(asyncio.to_thread(
+                        self._update, job_id,
+                        sources_done=len(timings), source_timings=json.dumps(timings)
+                    ))
+                    progress_writes.add(task)
+                    task.add_done_callback(progress_writes.discard)
+                
+                pipeline = ExtractionPipeline(
+                    categories, force_refresh=force_refresh,
+                    max_entries_per_feed=max_entries_per_feed, on_feed_done=on_feed_done
+                )
+                try:
+                    result = await pipeline.run()
+                    await asyncio.gather(*list(progress_writes), return_exceptions=True)
+                    await asyncio.to_thread(
+                        self._update, job_id, status="completed", finished_date=datetime.now(),
+                        sources_done=len(pipeline.source_timings),
+                        source_timings=json.dumps(pipeline.source_timings), **result
+                    )
+                except asyncio.TimeoutError:
+                    await asyncio.to_thread(
+                        self._update, job_id, status="failed", finished_date=datetime.now(),
+                        message="Extraction timed out - feeds may be slow",
+                        source_timings=json.dumps(pipeline.source_timings)
+                    )
+                except Exception as e:
+                    print(f"Extraction job {job_id} failed: {e}")
+                    await asyncio.to_thread(
+                        self._update, job_id, status="failed", finished_date=datetime.now(),
+                        message=f"Extraction failed: {str(e)[:200]}",
+                        source_timings=json.dumps(pipeline.source_timings)
+                    )
+        finally:
+            self._tasks.pop(job_id, None)
+    
+    def _update(self, job_id: int, **fields):
+        db = SessionLocal()
+        try:
+            db.query(models.ExtractionJob).filter(models.ExtractionJob.id == job_id).update(fields)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _heartbeat(self):
+        db = SessionLocal()
+        try:
+            db.query(models.ExtractionJob).filter(
+                models.ExtractionJob.owner == self.owner,
+                models.ExtractionJob.status.in_(ACTIVE_STATUSES)
+            ).update({"heartbeat_at": datetime.now()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _fail_stale_jobs(self):
+        """Fail other processes' active jobs that stopped heartbeating (their process died)"""
+        db = SessionLocal()
+        try:
+            cutoff = datetime.now() - timedelta(seconds=self.STALE_AFTER)
+            db.query(models.ExtractionJob).filter(
+                models.ExtractionJob.status.in_(ACTIVE_STATUSES),
+                or_(models.ExtractionJob.owner.is_(None), models.ExtractionJob.owner != self.owner),
+                or_(models.ExtractionJob.heartbeat_at.is_(None), models.ExtractionJob.heartbeat_at < cutoff)
+            ).update({
+                "status": "failed",
+                "message": "Interrupted - the worker running it stopped",
+                "finished_date": datetime.now()
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _acquire_lease(self, name: str) -> bool:
+        """Take or renew a named lease; True while this process holds it"""
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=self.STALE_AFTER)
+            renewed = db.query(models.SchedulerLease).filter(
+                models.SchedulerLease.name == name,
+                or_(models.SchedulerLease.owner == self.owner, models.SchedulerLease.expires_at < now)
+            ).update({"owner": self.owner, "expires_at": expires_at}, synchronize_session=False)
+            if not renewed:
+                # No row yet - the primary key lets only one process create it
+                db.add(models.SchedulerLease(name=name, owner=self.owner, expires_at=expires_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return False
+            return True
+        finally:
+            db.close()
+    
+    def _release(self):
+        """Fail this process's unfinished jobs and give up its leases"""
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            db.query(models.ExtractionJob).filter(
+                models.ExtractionJob.owner == self.owner,
+                models.ExtractionJob.status.in_(ACTIVE_STATUSES)
+            ).update({
+                "status": "failed",
+                "message": "Interrupted by server shutdown",
+                "finished_date": now
+            }, synchronize_session=False)
+            db.query(models.SchedulerLease).filter(
+                models.SchedulerLease.owner == self.owner
+            ).update({"owner": None, "expires_at": now}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+_scheduler: Optional[JobScheduler] = None
+
+def get_job_scheduler() -> JobScheduler:
+    """Process-wide job scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler()
+    return _scheduler
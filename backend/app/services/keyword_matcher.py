@@ -0,0 +1,103 @@
+from typing import List, Dict, Tuple, Optional
+from collections import defaultdict
+import json
+import os
+import re
+
+# Default rules - override with a JSON file at KEYWORD_RULES_PATH using the same keys
+DEFAULT_KEYWORD_RULES = {
+    "categories": {
+        "sports": ["sport", "game", "match", "player", "team", "championship", "league", "football", "cricket", "rugby", "tennis", "olympics"],
+        "lifestyle": ["lifestyle", "health", "wellness", "food", "travel", "fashion", "beauty", "home", "garden", "recipe", "diet"],
+        "music": ["music", "song", "album", "artist", "concert", "festival", "band", "singer", "musician", "chart", "billboard"],
+        "finance": ["finance", "business", "economy", "stock", "market", "investment", "bank", "money", "financial", "trading", "dollar", "currency"]
+    },
+    "breaking": [
+        "breaking", "urgent", "alert", "just in", "developing",
+        "live", "exclusive", "major", "significant", "critical"
+    ],
+    "important": [
+        "announcement", "decision", "reveals", "unveils", "launches",
+        "wins", "victory", "defeats", "championship", "record", "historic"
+    ]
+}
+
+class KeywordHits:
+    """Distinct keywords found per rule group in one scan"""
+    
+    def __init__(self, groups: Dict[str, set]):
+        self.groups = groups
+    
+    def count(self, group: str) -> int:
+        return len(self.groups.get(group, ()))
+    
+    def category_scores(self) -> Dict[str, int]:
+        return {
+            group.split(":", 1)[1]: len(keywords)
+            for group, keywords in self.groups.items() if group.startswith("category:")
+        }
+
+class KeywordMatcher:
+    """Word-boundary multi-keyword matcher built once from the keyword rules.
+    
+    Text is tokenized once and every 1..n-word window is looked up in a phrase table,
+    so a scan is linear in text length regardless of how many keywords there are.
+    A trailing "s"/"es" on the last word is ignored ("matches" hits "match").
+    """
+    
+    TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+    
+    def __init__(self, rules: Dict):
+        self.rules = rules
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[str, str]]] = defaultdict(list)
+        groups = {f"category:{category}": keywords for category, keywords in rules.get("categories", {}).items()}
+        groups["breaking"] = rules.get("breaking", [])
+        groups["important"] = rules.get("important", [])
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                phrase = tuple(self.TOKEN_RE.findall(keyword.lower()))
+                if phrase:
+                    self._phrases[phrase].append((group, keyword))
+        self.max_words = max((len(p) for p in self._phrases), default=1)
+    
+    @staticmethod
+    def _variants(token: str) -> List[str]:
+        variants = [token]
+        if len(token) > 3 and token.endswith("s"):
+            variants.append(token[:-1])
+            if token.endswith("es"):
+                variants.append(token[:-2])
+        return variants
+    
+    def scan(self, text: str) -> KeywordHits:
+        """Find every rule keyword in text in a single pass"""
+        tokens = self.TOKEN_RE.findall(text.lower())
+        found: Dict[str, set] = defaultdict(set)
+        for i in range(len(tokens)):
+            for n in range(1, min(self.max_words, len(tokens) - i) + 1):
+                head = tuple(tokens[i:i + n - 1])
+                for last in self._variants(tokens[i + n - 1]):
+                    for group, keyword in self._phrases.get(head + (last,), ()):
+                        found[group].add(keyword)
+        return KeywordHits(found)
+
+def load_keyword_rules(path: Optional[str] = None) -> Dict:
+    """Default rules, with any groups from the JSON config file replacing the defaults"""
+    rules = json.loads(json.dumps(DEFAULT_KEYWORD_RULES))
+    path = path or os.getenv("KEYWORD_RULES_PATH")
+    if path:
+        try:
+            with open(path) as f:
+                rules.update(json.load(f))
+        except Exception as e:
+            print(f"Error loading keyword rules from {path}: {e}")
+    return rules
+
+_matcher: Optional[KeywordMatcher] = None
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Process-wide matcher, compiled on first use"""
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher(load_keyword_rules())
+    return _matcher
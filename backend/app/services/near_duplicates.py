@@ -0,0 +1,211 @@
+from typing import List, Dict, Optional, Set
+import hashlib
+import os
+import re
+import zlib
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import models
+
+class MinHasher:
+    """MinHash signatures over character shingles, banded for LSH lookups"""
+    
+    NUM_PERM = 64
+    BANDS = 16  # 16 bands x 4 rows - candidate pairs above ~0.5 Jaccard
+    SHINGLE_SIZE = 5
+    _PRIME = (1 << 31) - 1
+    
+    def __init__(self):
+        # Fixed seed so signatures (and therefore bucket keys) are stable across processes
+        rng = np.random.RandomState(1)
+        self._a = rng.randint(1, self._PRIME, size=self.NUM_PERM).astype(np.uint64)
+        self._b = rng.randint(0, self._PRIME, size=self.NUM_PERM).astype(np.uint64)
+        self.rows = self.NUM_PERM // self.BANDS
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\W+", " ", text.lower()).strip()
+    
+    def shingles(self, text: str) -> Set[int]:
+        text = self.normalize(text)
+        if len(text) <= self.SHINGLE_SIZE:
+            return {zlib.crc32(text.encode())}
+        return {
+            zlib.crc32(text[i:i + self.SHINGLE_SIZE].encode())
+            for i in range(len(text) - self.SHINGLE_SIZE + 1)
+        }
+    
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(self.shingles(text), dtype=np.uint64) % np.uint64(self._PRIME)
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(self._PRIME)
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.BANDS)
+        ]
+    
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index assigning stable cluster ids to near-duplicate articles.
+    
+    Each new article costs one banded bucket lookup, so clustering stays sub-linear in
+    the corpus size. Candidates are confirmed by estimated Jaccard similarity and,
+    optionally, by embedding cosine similarity.
+    """
+    
+    JACCARD_THRESHOLD = float(os.getenv("DEDUP_JACCARD_THRESHOLD", "0.5"))
+    EMBEDDING_CONFIRM = os.getenv("DEDUP_EMBEDDING_CONFIRM", "false").lower() == "true"
+    EMBEDDING_THRESHOLD = float(os.getenv("DEDUP_EMBEDDING_THRESHOLD", "0.75"))
+    
+    def __init__(self, db: Session, hasher: Optional[MinHasher] = None):
+        self.db = db
+        self.hasher = hasher or get_min_hasher()
+    
+    @staticmethod
+    def article_text(article: Dict) -> str:
+        return f"{article.get('title', '')} {article.get('summary', '')}"
+    
+    def assign_clusters(self, articles: List[Dict]) -> List[Dict]:
+        """Set cluster_id / is_duplicate on articles, creating clusters and buckets as needed.
+        
+        Articles already stored (by source_url) keep their existing cluster. Nothing is
+        committed here; the caller commits with the articles.
+        """
+        urls = [a["source_url"] for a in articles if a.get("source_url")]
+        stored = {}
+        if urls:
+            # Only ids backed by a NewsCluster row; anything else is re-clustered below
+            stored = dict(self.db.query(models.Article.source_url, models.Article.cluster_id).join(
+                models.NewsCluster, models.NewsCluster.id == models.Article.cluster_id
+            ).filter(
+                models.Article.source_url.in_(urls)
+            ).all())
+        
+        pending = []
+        for article in articles:
+            if stored.get(article.get("source_url")) is not None:
+                article["cluster_id"] = stored[article["source_url"]]
+                article.setdefault("is_duplicate", False)
+            else:
+                signature = self.hasher.signature(self.article_text(article))
+                pending.append((article, signature, self.hasher.band_keys(signature)))
+        if not pending:
+            return articles
+        
+        # One indexed lookup for every band key in the batch
+        all_keys = {key for _, _, keys in pending for key in keys}
+        stored_buckets = self.db.query(models.LSHBucket.bucket, models.LSHBucket.cluster_id).filter(
+            models.LSHBucket.bucket.in_(all_keys)
+        ).all()
+        candidate_ids = {cluster_id for _, cluster_id in stored_buckets}
+        clusters = {}
+        if candidate_ids:
+            clusters = {
+                c.id: c for c in self.db.query(models.NewsCluster).filter(models.NewsCluster.id.in_(candidate_ids))
+            }
+        
+        # Buckets hold cluster objects so clusters created in this batch match before they have ids
+        buckets: Dict[str, Set[models.NewsCluster]] = {}
+        for key, cluster_id in stored_buckets:
+            if cluster_id in clusters:
+                buckets.setdefault(key, set()).add(clusters[cluster_id])
+        
+        created = []
+        assigned = []
+        new_buckets = []
+        for article, signature, keys in pending:
+            candidates = set().union(*(buckets.get(key, set()) for key in keys))
+            cluster = self._best_match(article, signature, list(candidates))
+            
+            if cluster is None:
+                cluster = models.NewsCluster(
+                    title=self.article_text(article)[:500],
+                    signature=signature.tobytes(),
+                    article_count=1
+                )
+                created.append(cluster)
+                article["is_duplicate"] = False
+            else:
+                cluster.article_count = (cluster.article_count or 1) + 1
+                article["is_duplicate"] = True
+            
+            # Index the member's bands too, so later coverage can match any member
+            for key in keys:
+                if cluster not in buckets.setdefault(key, set()):
+                    buckets[key].add(cluster)
+                    new_buckets.append((key, cluster))
+            assigned.append((article, cluster))
+        
+        # New clusters get their ids in one flush, then every bucket row goes in one insert
+        if created:
+            self.db.add_all(created)
+            self.db.flush()
+        for article, cluster in assigned:
+            article["cluster_id"] = cluster.id
+        if new_buckets:
+            self.db.bulk_insert_mappings(models.LSHBucket, [
+                {"bucket": key, "cluster_id": cluster.id} for key, cluster in new_buckets
+            ])
+        
+        return articles
+    
+    def _best_match(self, article: Dict, signature: np.ndarray,
+                    clusters: List[models.NewsCluster]) -> Optional[models.NewsCluster]:
+        scored = []
+        for cluster in clusters:
+            score = self.hasher.similarity(signature, np.frombuffer(cluster.signature, dtype=np.uint32))
+            if score >= self.JACCARD_THRESHOLD:
+                scored.append((score, cluster))
+        if not scored:
+            return None
+        scored.sort(key=lambda x: x[0], reverse=True)
+        
+        if self.EMBEDDING_CONFIRM:
+            return self._confirm_with_embeddings(article, [cluster for _, cluster in scored])
+        return scored[0][1]
+    
+    def _confirm_with_embeddings(self, article: Dict,
+                                 clusters: List[models.NewsCluster]) -> Optional[models.NewsCluster]:
+        """Keep the best LSH candidate whose representative is also semantically close"""
+        from app.services.embedding_model import get_embedding_model
+        vectors = get_embedding_model().encode(
+            [self.article_text(article)] + [cluster.title or "" for cluster in clusters],
+            normalize_embeddings=True
+        )
+        similarities = vectors[1:] @ vectors[0]
+        best = int(np.argmax(similarities))
+        return clusters[best] if similarities[best] >= self.EMBEDDING_THRESHOLD else None
+
+def migrate_legacy_clusters(engine: Engine):
+    """Clear cluster ids that don't come from the LSH index (called from init_db).
+    
+    Before the index existed cluster_id was hash(title) % 1000, which overlaps the
+    NewsCluster autoincrement ids. Until the first cluster is created every stored id is
+    such a legacy value; afterwards only ids without a NewsCluster row are. The cleared
+    articles keep their highlights (looked up per article) and are re-clustered when seen again.
+    """
+    with engine.begin() as conn:
+        has_clusters = conn.execute(text("SELECT 1 FROM news_clusters LIMIT 1")).first() is not None
+        if has_clusters:
+            conn.execute(text(
+                "UPDATE articles SET cluster_id = NULL WHERE cluster_id IS NOT NULL "
+                "AND NOT EXISTS (SELECT 1 FROM news_clusters WHERE news_clusters.id = articles.cluster_id)"
+            ))
+        else:
+            conn.execute(text("UPDATE articles SET cluster_id = NULL WHERE cluster_id IS NOT NULL"))
+
+_hasher: Optional[MinHasher] = None
+
+def get_min_hasher() -> MinHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = MinHasher()
+    return _hasher
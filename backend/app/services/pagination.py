@@ -0,0 +1,33 @@
+from typing import Any, List, Optional
+import base64
+import json
+
+# Keyset pagination: the cursor is the sort key of the last row on the previous page,
+# so every page is one index range scan no matter how deep it is.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Upper bound for any page size so no endpoint returns an unbounded result set
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque, URL-safe cursor for a row's sort key"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+def next_cursor(rows: List[dict], limit: int, keys: List[str]) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor([last[key] for key in keys])
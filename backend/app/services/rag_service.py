@@ -1,64 +1,74 @@
 import os
-from typing import List, Dict, Optional
-from openai import OpenAI
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Optional, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import json
 from dotenv import load_dotenv
+from app.services.embedding_model import get_embedding_model, EMBEDDING_MODEL_NAME
 
 load_dotenv()
 
 class RAGService:
     """Retrieval-Augmented Generation service for chatbot - Memory optimized"""
     
+    EMBEDDING_MODEL_NAME = EMBEDDING_MODEL_NAME
+    CHAT_MODEL = "gpt-3.5-turbo"
+    NO_CONTEXT_ANSWER = "I don't have any recent news articles to answer your question. Please extract news first by clicking the 'Extract News' button."
+    
     def __init__(self):
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             self.client = OpenAI(api_key=api_key)
+            # Streaming chat uses the async client so no executor thread is held per request
+            self.async_client = AsyncOpenAI(api_key=api_key)
         else:
             self.client = None
+            self.async_client = None
             print("Warning: OPENAI_API_KEY not set. RAG will use simple responses.")
-        
-        # Lazy load embedding model - don't load until actually needed
-        self._embedding_model = None
     
     @property
     def embedding_model(self):
-        """Lazy load embedding model only when accessed"""
-        if self._embedding_model is None:
-            self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        return self._embedding_model
+        """Shared embedding model - loaded once per process on first access"""
+        return get_embedding_model()
     
     def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text"""
         return self.embedding_model.encode(text)
     
-    def find_relevant_articles(self, query: str, articles: List[Dict], top_k: int = 5) -> List[Dict]:
-        """Find most relevant articles for a query using semantic search"""
-        if not articles:
-            return []
-        
-        # Generate query embedding
-        query_embedding = self.generate_embedding(query)
-        
-        # Calculate similarities
-        similarities = []
-        for article in articles:
-            # Use title and summary for matching
-            text = f"{article.get('title', '')} {article.get('summary', '')}"
-            article_embedding = self.generate_embedding(text)
-            
-            similarity = cosine_similarity(
-                query_embedding.reshape(1, -1),
-                article_embedding.reshape(1, -1)
-            )[0][0]
-            
-            similarities.append((similarity, article))
+    @staticmethod
+    def article_text(article: Dict) -> str:
+        """Text used to embed an article"""
+        return f"{article.get('title', '')} {article.get('summary', '')}"
+    
+    @staticmethod
+    def sources_for(context_articles: List[Dict]) -> Dict:
+        """Sources and related article ids reported alongside an answer"""
+        return {
+            "sources": list(set([art.get("source", "Unknown") for art in context_articles])),
+            "related_articles": [art.get("id") for art in context_articles]
+        }
+    
+    @staticmethod
+    def build_messages(question: str, context_articles: List[Dict]) -> List[Dict]:
+        """Chat prompt with the top context articles inlined"""
+        context_text = ""
+        for i, article in enumerate(context_articles[:5]):  # Use top 5 articles for better context
+            context_text += f"Article {i+1} ({article.get('category', 'unknown').upper()}):\n"
+            context_text += f"Title: {article.get('title', '')}\n"
+            summary = article.get('summary', '')
+            if summary:
+                context_text += f"Summary: {summary}\n"
+            context_text += f"Source: {article.get('source', 'Unknown')}\n\n"
         
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [article for _, article in similarities[:top_k]]
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful news assistant. Answer questions based on the provided news articles. Be informative and provide specific details from the articles. If the question asks about a specific category (like sports, finance, music), focus on articles from that category. Always provide a helpful answer using the context provided."
+            },
+            {
+                "role": "user",
+                "content": f"Here are recent news articles:\n\n{context_text}\n\nQuestion: {question}\n\nPlease provide a detailed answer based on the articles above. Include specific information from the articles when relevant."
+            }
+        ]
     
     def generate_response(self, question: str, context_articles: List[Dict], category: Optional[str] = None) -> Dict:
         """Generate chatbot response using RAG"""
@@ -76,39 +86,18 @@ class RAGService:
                 "related_articles": []
             }
         
-        # Build context from articles
-        context_text = ""
         if not context_articles:
             return {
-                "answer": "I don't have any recent news articles to answer your question. Please extract news first by clicking the 'Extract News' button.",
+                "answer": self.NO_CONTEXT_ANSWER,
                 "sources": [],
                 "related_articles": []
             }
         
-        for i, article in enumerate(context_articles[:5]):  # Use top 5 articles for better context
-            context_text += f"Article {i+1} ({article.get('category', 'unknown').upper()}):\n"
-            context_text += f"Title: {article.get('title', '')}\n"
-            summary = article.get('summary', '')
-            if summary:
-                context_text += f"Summary: {summary}\n"
-            context_text += f"Source: {article.get('source', 'Unknown')}\n\n"
-        
         try:
             # Generate response using OpenAI
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful news assistant. Answer questions based on the provided news articles. Be informative and provide specific details from the articles. If the question asks about a specific category (like sports, finance, music), focus on articles from that category. Always provide a helpful answer using the context provided."
-                },
-                {
-                    "role": "user",
-                    "content": f"Here are recent news articles:\n\n{context_text}\n\nQuestion: {question}\n\nPlease provide a detailed answer based on the articles above. Include specific information from the articles when relevant."
-                }
-            ]
-            
             response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
+                model=self.CHAT_MODEL,
+                messages=self.build_messages(question, context_articles),
                 max_tokens=200,  # Reduced for faster response
                 temperature=0.7,
                 timeout=15  # 15 second timeout per request
@@ -116,11 +105,7 @@ class RAGService:
             
             answer = response.choices[0].message.content.strip()
             
-            return {
-                "answer": answer,
-                "sources": list(set([art.get("source", "Unknown") for art in context_articles])),
-                "related_articles": [art.get("id") for art in context_articles]
-            }
+            return {"answer": answer, **self.sources_for(context_articles)}
         except Exception as e:
             print(f"Error generating RAG response: {e}")
             return {
@@ -128,4 +113,42 @@ class RAGService:
                 "sources": [],
                 "related_articles": []
             }
+    
+    async def stream_response(self, question: str, context_articles: List[Dict]) -> AsyncIterator[str]:
+        """Yield answer text as the model generates it (stream=True on the async client).
+        
+        Without an API key or context the fallback answer is yielded as a single chunk;
+        API errors propagate so the caller can report them mid-stream.
+        """
+        if not self.async_client:
+            if context_articles:
+                yield f"Based on the news, {context_articles[0].get('summary', 'No information available.')}"
+            else:
+                yield "I don't have enough information to answer that question. Please try asking about recent news highlights."
+            return
+        
+        if not context_articles:
+            yield self.NO_CONTEXT_ANSWER
+            return
+        
+        stream = await self.async_client.chat.completions.create(
+            model=self.CHAT_MODEL,
+            messages=self.build_messages(question, context_articles),
+            max_tokens=200,
+            temperature=0.7,
+            timeout=15,  # Applies per network read, so a slow but live stream isn't cut off
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# One service (and OpenAI client) per process instead of per request
+_rag_service: Optional[RAGService] = None
 
+def get_rag_service() -> RAGService:
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService()
+    return _rag_service
@@ -0,0 +1,153 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.database import engine
+
+# data_versions row bumped with every article/highlight write
+DATA_VERSION_NAME = "articles"
+
+class ResponseCache:
+    """In-process LRU cache of pre-serialized JSON responses.
+    
+    Entries expire after a TTL and are invalidated wholesale when the data version is
+    bumped: directly by writers in this process, and otherwise when the shared
+    data_versions counter (bumped in the writer's transaction) is seen to change, which
+    is checked at most every VERSION_POLL seconds. Other worker processes therefore
+    serve stale responses for at most VERSION_POLL, not the TTL.
+    """
+    
+    MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    VERSION_POLL = float(os.getenv("RESPONSE_CACHE_VERSION_POLL", "2"))
+    
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else self.TTL
+        self.version = 0
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, bytes, str, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared_version: Optional[int] = None
+        self._polled_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+    
+    def sync_version(self, engine: Engine):
+        """Invalidate if another process bumped the shared data version since the last poll"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._polled_at < self.VERSION_POLL:
+                return
+            self._polled_at = now
+        shared = read_shared_version(engine)
+        if shared is None:
+            return
+        if shared != self._shared_version:
+            first_poll = self._shared_version is None
+            self._shared_version = shared
+            if not first_poll:
+                self.bump_version()
+    
+    def bump_version(self):
+        """Invalidate every cached response - call after data changes are committed"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+    
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, str, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            version, stored_at, body, etag, headers = entry
+            if version != self.version or time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, etag, headers
+    
+    def set(self, key: Tuple, body: bytes, version: int, headers: Optional[Dict[str, str]] = None) -> str:
+        """Store a serialized body (and extra response headers) computed at `version`; returns its ETag"""
+        etag = f'"{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        with self._lock:
+            # Skip storing if the data changed while the response was being built
+            if version == self.version:
+                self._entries[key] = (version, time.monotonic(), body, etag, headers or {})
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return etag
+
+def ensure_data_version(engine: Engine):
+    """Seed the shared data_versions row (called from init_db) so bumps are plain UPDATEs"""
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM data_versions WHERE name = :name"), {"name": DATA_VERSION_NAME}
+        ).first()
+        if exists is None:
+            conn.execute(
+                text("INSERT INTO data_versions (name, version) VALUES (:name, 0)"), {"name": DATA_VERSION_NAME}
+            )
+
+def read_shared_version(engine: Engine) -> Optional[int]:
+    """Current shared data version, or None if it can't be read"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT version FROM data_versions WHERE name = :name"), {"name": DATA_VERSION_NAME}
+            ).scalar()
+    except Exception as e:
+        print(f"Error reading shared data version: {e}")
+        return None
+
+def bump_shared_version(db: Session):
+    """Bump the shared data version in the caller's transaction (commit with the writes)"""
+    db.execute(
+        text("UPDATE data_versions SET version = version + 1 WHERE name = :name"), {"name": DATA_VERSION_NAME}
+    )
+
+_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+def cached_json_response(request: Request, build: Callable[[], Any],
+                         extra_headers: Optional[Callable[[Any], Dict[str, str]]] = None) -> Response:
+    """Serve a JSON response from the cache (keyed by path + query params), honouring If-None-Match.
+    
+    extra_headers, if given, derives additional headers (e.g. a pagination cursor) from the
+    encoded data; they are cached along with the body.
+    """
+    cache = get_response_cache()
+    cache.sync_version(engine)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    
+    cached = cache.get(key)
+    if cached is None:
+        version = cache.version
+        data = jsonable_encoder(build())
+        body = json.dumps(data, separators=(",", ":")).encode()
+        extra = {k: v for k, v in (extra_headers(data) if extra_headers else {}).items() if v is not None}
+        etag = cache.set(key, body, version, extra)
+    else:
+        body, etag, extra = cached
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **extra}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
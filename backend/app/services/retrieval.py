@@ -0,0 +1,129 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import os
+import time
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import ReadSessionLocal
+from app.services.embedding_model import get_embedding_model, EMBEDDING_MODEL_NAME
+from app.services.keyword_matcher import get_keyword_matcher
+from app.services.search_index import search_articles
+from app.services.vector_index import get_vector_index
+
+# Set RETRIEVAL_VECTOR_ENABLED=false to skip query embedding (lexical-only retrieval)
+RETRIEVAL_VECTOR_ENABLED = os.getenv("RETRIEVAL_VECTOR_ENABLED", "true").lower() == "true"
+
+# Default recency window for chat context; 0 searches the whole corpus
+RETRIEVAL_MAX_AGE_DAYS = int(os.getenv("RETRIEVAL_MAX_AGE_DAYS", "0"))
+
+@lru_cache(maxsize=256)
+def encode_question(question: str) -> Optional[np.ndarray]:
+    """Query embedding, memoized so retrieval and the answer cache share one encode"""
+    if not RETRIEVAL_VECTOR_ENABLED:
+        return None
+    try:
+        return get_embedding_model().encode(question)
+    except Exception as e:
+        print(f"Question embedding failed: {e}")
+        return None
+
+class HybridRetriever:
+    """Lexical (BM25) + vector candidate generation fused with reciprocal-rank fusion.
+    
+    Both candidate lists are produced concurrently with category and recency filters
+    applied inside each index, then merged by rank so neither score scale dominates.
+    An explicit category is a hard filter; a category guessed from the question's
+    keywords only boosts its articles, through a third category-filtered lexical list.
+    """
+    
+    # Standard RRF damping constant; larger values flatten the contribution of top ranks
+    RRF_K = 60
+    # Candidates taken from each retriever before fusion
+    CANDIDATES = 20
+    
+    def __init__(self):
+        self.vector_index = get_vector_index(EMBEDDING_MODEL_NAME)
+        self.matcher = get_keyword_matcher()
+        self.last_timings: Dict[str, float] = {}
+    
+    def infer_category(self, question: str) -> Optional[str]:
+        """Category whose rule keywords the question mentions most, if any"""
+        scores = self.matcher.scan(question).category_scores()
+        best = max(scores.items(), key=lambda item: item[1], default=(None, 0))
+        return best[0] if best[1] > 0 else None
+    
+    @classmethod
+    def fuse(cls, ranked_lists: List[List[Tuple[int, float]]], top_k: int) -> List[Tuple[int, float]]:
+        """Reciprocal-rank fusion: score(d) = sum over lists of 1 / (k + rank)"""
+        fused: Dict[int, float] = {}
+        for ranked in ranked_lists:
+            for rank, (article_id, _) in enumerate(ranked, start=1):
+                fused[article_id] = fused.get(article_id, 0.0) + 1.0 / (cls.RRF_K + rank)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    
+    def vector_candidates(self, question: str, category: Optional[str],
+                          since: Optional[datetime]) -> List[Tuple[int, float]]:
+        """Nearest articles by embedding; empty when no vectors are indexed"""
+        if not RETRIEVAL_VECTOR_ENABLED:
+            return []
+        started = time.perf_counter()
+        try:
+            if not self.vector_index.loaded:
+                db = ReadSessionLocal()
+                try:
+                    self.vector_index.ensure_loaded(db)
+                finally:
+                    db.close()
+            if not len(self.vector_index):
+                return []
+            query_vector = encode_question(question)
+            if query_vector is None:
+                return []
+            return self.vector_index.search(query_vector, self.CANDIDATES, category=category, since=since)
+        except Exception as e:
+            print(f"Vector retrieval failed: {e}")
+            return []
+        finally:
+            self.last_timings["vector_ms"] = (time.perf_counter() - started) * 1000
+    
+    async def retrieve(self, db: AsyncSession, question: str, top_k: int = 5,
+                       category: Optional[str] = None,
+                       max_age_days: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return (article_id, fused score) pairs for the question, best first.
+        
+        category restricts results to that category; without it, articles in the
+        category the question's keywords suggest are ranked higher but not required.
+        """
+        started = time.perf_counter()
+        boost_category = None if category else self.infer_category(question)
+        max_age_days = RETRIEVAL_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        since = datetime.now() - timedelta(days=max_age_days) if max_age_days else None
+        
+        def lexical_candidates(session):
+            ranked = [search_articles(session, question, limit=self.CANDIDATES, category=category, since=since)]
+            if boost_category:
+                ranked.append(search_articles(
+                    session, question, limit=self.CANDIDATES, category=boost_category, since=since
+                ))
+            return ranked
+        
+        lexical, semantic = await asyncio.gather(
+            db.run_sync(lexical_candidates),
+            asyncio.to_thread(self.vector_candidates, question, category, since)
+        )
+        
+        fused = self.fuse(lexical + [semantic], top_k)
+        self.last_timings["total_ms"] = (time.perf_counter() - started) * 1000
+        return fused
+
+
+# Shared retriever - holds no per-request state besides the last timings
+_retriever: Optional[HybridRetriever] = None
+
+def get_hybrid_retriever() -> HybridRetriever:
+    global _retriever
+    if _retriever is None:
+        _retriever = HybridRetriever()
+    return _retriever
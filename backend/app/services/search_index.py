@@ -0,0 +1,128 @@
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text, bindparam, DateTime
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# SQLite keeps a separate FTS5 table keyed by article id; PostgreSQL uses a generated tsvector column
+FTS_TABLE = "articles_fts"
+
+# Column weights for BM25 / ts_rank: title matters most, then summary, then body
+TITLE_WEIGHT, SUMMARY_WEIGHT, CONTENT_WEIGHT = 5.0, 2.0, 1.0
+
+# Question words that would otherwise match nearly every document
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "about", "as", "at", "be", "by", "can", "did", "do",
+    "does", "for", "from", "has", "have", "how", "i", "in", "is", "it", "latest", "me",
+    "news", "of", "on", "or", "recent", "tell", "that", "the", "there", "this", "to",
+    "was", "what", "when", "where", "which", "who", "why", "with", "you"
+}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def query_terms(query: str) -> List[str]:
+    """Lowercased search terms with stopwords removed (falls back to all terms)"""
+    tokens = [token.lower() for token in TOKEN_PATTERN.findall(query or "")]
+    terms = [token for token in tokens if token not in STOPWORDS and len(token) > 1]
+    return list(dict.fromkeys(terms or tokens))
+
+def fts5_match_expression(terms: List[str], match_all: bool = False) -> str:
+    """Quote each term so user input can't inject FTS5 query syntax"""
+    return (" AND " if match_all else " OR ").join(f'"{term}"' for term in terms)
+
+def ensure_search_index(engine: Engine):
+    """Create the full-text index for this dialect and backfill it if it is empty"""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                    "USING fts5(title, summary, content, tokenize='porter unicode61')"
+                ))
+                empty = conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {FTS_TABLE})")).scalar()
+                if empty:
+                    conn.execute(text(
+                        f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content) "
+                        "SELECT id, title, coalesce(summary, ''), coalesce(content, '') FROM articles"
+                    ))
+            elif dialect == "postgresql":
+                conn.execute(text(
+                    "ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                    "GENERATED ALWAYS AS ("
+                    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+                    "setweight(to_tsvector('english', coalesce(content, '')), 'D')"
+                    ") STORED"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING GIN (search_vector)"
+                ))
+    except Exception as e:
+        print(f"Full-text search index unavailable ({dialect}): {e}")
+
+def index_articles(db: Session, article_ids: List[int]):
+    """Refresh the FTS rows for new or changed articles inside the caller's transaction.
+    
+    PostgreSQL's generated column is maintained by the database, so this is SQLite-only.
+    """
+    if not article_ids or db.get_bind().dialect.name != "sqlite":
+        return
+    ids = list(set(article_ids))
+    params = bindparam("ids", expanding=True)
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(params), {"ids": ids})
+    db.execute(text(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content) "
+        "SELECT id, title, coalesce(summary, ''), coalesce(content, '') FROM articles WHERE id IN :ids"
+    ).bindparams(params), {"ids": ids})
+
+def search_articles(db: Session, query: str, limit: int = 20, category: Optional[str] = None,
+                    match_all: bool = False, since: Optional[datetime] = None) -> List[Tuple[int, float]]:
+    """BM25-ranked search over title, summary and content.
+    
+    Returns (article_id, score) pairs, best first; higher scores are better. since keeps
+    only articles published (or, failing that, extracted) at or after that time.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    
+    dialect = db.get_bind().dialect.name
+    params = {"limit": limit, "category": category, "since": since}
+    filters = "AND a.category = :category" if category else ""
+    if since:
+        filters += " AND coalesce(a.published_date, a.extracted_date) >= :since"
+    
+    if dialect == "sqlite":
+        params["match"] = fts5_match_expression(terms, match_all)
+        # FTS5's bm25() is lower-is-better, so negate it for the caller
+        sql = (
+            f"SELECT a.id, -bm25({FTS_TABLE}, {TITLE_WEIGHT}, {SUMMARY_WEIGHT}, {CONTENT_WEIGHT}) AS score "
+            f"FROM {FTS_TABLE} JOIN articles a ON a.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match {filters} "
+            "ORDER BY score DESC LIMIT :limit"
+        )
+    elif dialect == "postgresql":
+        params["match"] = (" & " if match_all else " | ").join(terms)
+        # ts_rank_cd with length normalisation is PostgreSQL's closest built-in to BM25
+        sql = (
+            "SELECT a.id, ts_rank_cd("
+            f"'{{{CONTENT_WEIGHT / TITLE_WEIGHT}, 0, {SUMMARY_WEIGHT / TITLE_WEIGHT}, 1}}', "
+            "a.search_vector, q, 1) AS score "
+            "FROM articles a, to_tsquery('english', :match) q "
+            f"WHERE a.search_vector @@ q {filters} "
+            "ORDER BY score DESC LIMIT :limit"
+        )
+    else:
+        return []
+    
+    try:
+        statement = text(sql)
+        if since:
+            statement = statement.bindparams(bindparam("since", type_=DateTime))
+        rows = db.execute(statement, params).all()
+    except Exception as e:
+        print(f"Full-text search failed: {e}")
+        return []
+    return [(row[0], float(row[1])) for row in rows]
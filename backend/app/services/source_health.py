@@ -0,0 +1,145 @@
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+import json
+import math
+import os
+from sqlalchemy.orm import Session
+from app import models
+
+class SourceHealthStore:
+    """Per-feed health: circuit breaker plus latency history for adaptive timeouts.
+    
+    Loaded once per run like FeedCacheStore; updates are committed with the run.
+    A feed whose runs fail FAILURE_THRESHOLD times in a row (after retries) is skipped ("open") for a
+    cool-down that doubles with every further failure; when it expires one probe is
+    allowed ("half_open") and a success closes the circuit again.
+    """
+    
+    FAILURE_THRESHOLD = int(os.getenv("SOURCE_FAILURE_THRESHOLD", "3"))
+    BASE_COOLDOWN = float(os.getenv("SOURCE_BASE_COOLDOWN", "300"))  # Seconds
+    MAX_COOLDOWN = float(os.getenv("SOURCE_MAX_COOLDOWN", str(6 * 3600)))
+    
+    # Timeout = p95 of recent fetch times x multiplier, clamped to [MIN_TIMEOUT, max_timeout]
+    LATENCY_WINDOW = 50
+    MIN_SAMPLES = 5
+    TIMEOUT_MULTIPLIER = 2.0
+    MIN_TIMEOUT = float(os.getenv("SOURCE_MIN_TIMEOUT", "2"))
+    
+    def __init__(self, db: Session, max_timeout: float = 8.0):
+        self.db = db
+        self.max_timeout = max_timeout
+        self._rows: Optional[Dict[str, models.SourceHealth]] = None
+    
+    def _load(self) -> Dict[str, models.SourceHealth]:
+        """Load every source's health in one query on first use"""
+        if self._rows is None:
+            self._rows = {row.rss_url: row for row in self.db.query(models.SourceHealth).all()}
+        return self._rows
+    
+    def preload(self):
+        """Load up front (e.g. from a worker thread) so lookups never hit the DB"""
+        self._load()
+    
+    def get(self, rss_url: str) -> Optional[models.SourceHealth]:
+        return self._load().get(rss_url)
+    
+    def _row(self, rss_url: str) -> models.SourceHealth:
+        rows = self._load()
+        row = rows.get(rss_url)
+        if row is None:
+            row = models.SourceHealth(
+                rss_url=rss_url, state="closed", consecutive_failures=0,
+                total_successes=0, total_failures=0, latencies="[]"
+            )
+            self.db.add(row)
+            rows[rss_url] = row
+        return row
+    
+    @staticmethod
+    def latencies(row: Optional[models.SourceHealth]) -> List[float]:
+        return json.loads(row.latencies or "[]") if row else []
+    
+    @staticmethod
+    def percentile(values: List[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+    
+    def allow(self, rss_url: str) -> bool:
+        """Whether to fetch this feed now; moves an expired open circuit to half_open"""
+        row = self.get(rss_url)
+        if row is None or row.state != "open":
+            return True
+        if row.open_until and datetime.now() < row.open_until:
+            return False
+        row.state = "half_open"
+        return True
+    
+    def timeout_for(self, rss_url: str) -> float:
+        """Per-attempt timeout adapted to the source's observed p95 latency"""
+        samples = self.latencies(self.get(rss_url))
+        if len(samples) < self.MIN_SAMPLES:
+            return self.max_timeout
+        p95 = self.percentile(samples, 0.95)
+        return min(self.max_timeout, max(self.MIN_TIMEOUT, p95 * self.TIMEOUT_MULTIPLIER))
+    
+    def record_success(self, rss_url: str, latency: float):
+        row = self._row(rss_url)
+        row.state = "closed"
+        row.consecutive_failures = 0
+        row.total_successes = (row.total_successes or 0) + 1
+        row.last_status = "ok"
+        row.last_error = None
+        row.last_success_at = datetime.now()
+        row.open_until = None
+        row.latencies = json.dumps((self.latencies(row) + [round(latency, 3)])[-self.LATENCY_WINDOW:])
+    
+    def record_failure(self, rss_url: str, status: str, error: Optional[str] = None) -> bool:
+        """Count one failed run (retries exhausted); returns True when the circuit is (now) open"""
+        row = self._row(rss_url)
+        now = datetime.now()
+        row.consecutive_failures = (row.consecutive_failures or 0) + 1
+        row.total_failures = (row.total_failures or 0) + 1
+        row.last_status = status
+        row.last_error = (error or status)[:500]
+        row.last_failure_at = now
+        if row.state == "half_open" or row.consecutive_failures >= self.FAILURE_THRESHOLD:
+            trips = max(0, row.consecutive_failures - self.FAILURE_THRESHOLD)
+            cooldown = min(self.MAX_COOLDOWN, self.BASE_COOLDOWN * 2 ** trips)
+            row.state = "open"
+            row.open_until = now + timedelta(seconds=cooldown)
+        return row.state == "open"
+    
+    def report(self) -> List[Dict]:
+        """Health of every known source, unhealthiest first"""
+        report = []
+        for row in self._load().values():
+            samples = self.latencies(row)
+            p95 = self.percentile(samples, 0.95)
+            attempts = (row.total_successes or 0) + (row.total_failures or 0)
+            report.append({
+                "rss_url": row.rss_url,
+                "state": row.state,
+                "consecutive_failures": row.consecutive_failures or 0,
+                "success_rate": round((row.total_successes or 0) / attempts, 3) if attempts else None,
+                "p50_seconds": self.percentile(samples, 0.5),
+                "p95_seconds": p95,
+                "timeout_seconds": round(self.timeout_for(row.rss_url), 3),
+                "last_status": row.last_status,
+                "last_error": row.last_error,
+                "last_success_at": row.last_success_at,
+                "last_failure_at": row.last_failure_at,
+                "open_until": row.open_until
+            })
+        state_order = {"open": 0, "half_open": 1, "closed": 2}
+        report.sort(key=lambda r: (state_order.get(r["state"], 3), -r["consecutive_failures"], r["rss_url"]))
+        return report
+    
+    def save(self):
+        """Persist health updates from this run"""
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error saving source health: {e}")
@@ -0,0 +1,208 @@
+from typing import List, Dict, Tuple, Optional, Iterable, NamedTuple
+from datetime import datetime
+import threading
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+
+class IndexSnapshot(NamedTuple):
+    """Immutable view of the index; replaced as a whole so readers never see a mix"""
+    ids: np.ndarray
+    matrix: Optional[np.ndarray]
+    categories: np.ndarray
+    timestamps: np.ndarray
+    positions: Dict[int, int]
+
+EMPTY_SNAPSHOT = IndexSnapshot(
+    np.empty(0, dtype=np.int64), None, np.empty(0, dtype=object), np.empty(0, dtype=np.float64), {}
+)
+
+class VectorIndex:
+    """In-memory flat index of L2-normalized article embeddings.
+    
+    Vectors are persisted once as float32 blobs in article_embeddings and loaded into a
+    single (n, dim) matrix, so a query is one matrix-vector product. Each row also
+    carries its article's category and timestamp so filters are vectorized masks.
+    """
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Writers build a new snapshot under the lock and swap this one reference;
+        # readers take the reference once and use only that snapshot
+        self._snapshot = EMPTY_SNAPSHOT
+    
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+    
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+    
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._snapshot.positions
+    
+    @staticmethod
+    def to_blob(vector) -> bytes:
+        return np.asarray(vector, dtype=np.float32).tobytes()
+    
+    @staticmethod
+    def from_blob(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype=np.float32)
+    
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    @staticmethod
+    def article_metadata(db: Session, article_ids: List[int]) -> Dict[int, Tuple[str, float]]:
+        """Category and recency timestamp (published, else extracted) per article"""
+        rows = db.query(
+            models.Article.id,
+            models.Article.category,
+            func.coalesce(models.Article.published_date, models.Article.extracted_date)
+        ).filter(models.Article.id.in_(article_ids)).all()
+        return {row[0]: (row[1] or "", row[2].timestamp() if row[2] else 0.0) for row in rows}
+    
+    def ensure_loaded(self, db: Session):
+        """Load all stored vectors for this model on first use"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = db.query(
+                models.ArticleEmbedding.article_id,
+                models.ArticleEmbedding.vector,
+                models.Article.category,
+                func.coalesce(models.Article.published_date, models.Article.extracted_date).label("recency")
+            ).join(
+                models.Article, models.Article.id == models.ArticleEmbedding.article_id
+            ).filter(
+                models.ArticleEmbedding.model == self.model_name
+            ).all()
+            if rows:
+                ids = np.fromiter((row.article_id for row in rows), dtype=np.int64, count=len(rows))
+                matrix = self.normalize(np.stack([self.from_blob(row.vector) for row in rows]))
+                categories = np.asarray([row.category or "" for row in rows], dtype=object)
+                timestamps = np.fromiter(
+                    (row.recency.timestamp() if row.recency else 0.0 for row in rows),
+                    dtype=np.float64, count=len(rows)
+                )
+                self._set(ids, matrix, categories, timestamps)
+            self._loaded = True
+    
+    def _set(self, ids: np.ndarray, matrix: np.ndarray, categories: np.ndarray, timestamps: np.ndarray):
+        positions = {int(article_id): i for i, article_id in enumerate(ids)}
+        self._snapshot = IndexSnapshot(ids, matrix, categories, timestamps, positions)
+    
+    def add(self, article_ids: List[int], vectors, metadata: Optional[Dict[int, Tuple[str, float]]] = None):
+        """Add or replace vectors (and their category/timestamp metadata) in the in-memory matrix"""
+        if not article_ids:
+            return
+        vectors = self.normalize(vectors)
+        metadata = metadata or {}
+        with self._lock:
+            current = self._snapshot
+            ids = current.ids.copy()
+            matrix = current.matrix.copy() if current.matrix is not None else np.empty((0, vectors.shape[1]), dtype=np.float32)
+            categories = current.categories.copy()
+            timestamps = current.timestamps.copy()
+            new_ids, new_rows, new_categories, new_timestamps = [], [], [], []
+            for article_id, vector in zip(article_ids, vectors):
+                category, timestamp = metadata.get(article_id, ("", 0.0))
+                position = current.positions.get(article_id)
+                if position is not None:
+                    matrix[position] = vector
+                    if article_id in metadata:
+                        categories[position] = category
+                        timestamps[position] = timestamp
+                else:
+                    new_ids.append(article_id)
+                    new_rows.append(vector)
+                    new_categories.append(category)
+                    new_timestamps.append(timestamp)
+            if new_ids:
+                ids = np.concatenate([ids, np.asarray(new_ids, dtype=np.int64)])
+                matrix = np.vstack([matrix, np.stack(new_rows)])
+                categories = np.concatenate([categories, np.asarray(new_categories, dtype=object)])
+                timestamps = np.concatenate([timestamps, np.asarray(new_timestamps, dtype=np.float64)])
+            self._set(ids, matrix, categories, timestamps)
+    
+    def remove(self, article_ids: Iterable[int]):
+        """Drop vectors for articles that no longer exist or changed"""
+        drop = {i for i in article_ids if i in self._snapshot.positions}
+        if not drop:
+            return
+        with self._lock:
+            current = self._snapshot
+            keep = np.array([int(i) not in drop for i in current.ids], dtype=bool)
+            self._set(current.ids[keep], current.matrix[keep], current.categories[keep], current.timestamps[keep])
+    
+    def save(self, db: Session, article_ids: List[int], vectors):
+        """Persist vectors as float32 blobs and add them to the index (caller commits)"""
+        if not article_ids:
+            return
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        db.query(models.ArticleEmbedding).filter(
+            models.ArticleEmbedding.article_id.in_(article_ids)
+        ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(models.ArticleEmbedding, [
+            {
+                "article_id": article_id,
+                "model": self.model_name,
+                "dim": int(vector.shape[0]),
+                "vector": self.to_blob(vector)
+            }
+            for article_id, vector in zip(article_ids, vectors)
+        ])
+        self.add(article_ids, vectors, self.article_metadata(db, article_ids))
+    
+    def search(self, query_vector, top_k: int = 5, candidate_ids: Optional[List[int]] = None,
+               category: Optional[str] = None, since: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        """Return (article_id, cosine similarity) pairs, best first.
+        
+        category and since restrict the results to matching rows.
+        """
+        ids, matrix, categories, timestamps, positions = self._snapshot
+        if matrix is None or not len(ids):
+            return []
+        
+        if candidate_ids is not None:
+            rows = np.array([positions[i] for i in candidate_ids if i in positions], dtype=np.int64)
+            if not len(rows):
+                return []
+            ids, matrix, categories, timestamps = ids[rows], matrix[rows], categories[rows], timestamps[rows]
+        
+        # Score every row in place and filter the scores, rather than copying the matching rows
+        scores = matrix @ self.normalize(query_vector)[0]
+        if category is not None or since is not None:
+            mask = np.ones(len(ids), dtype=bool)
+            if category is not None:
+                mask &= categories == category
+            if since is not None:
+                mask &= timestamps >= since.timestamp()
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return []
+            ids, scores = ids[rows], scores[rows]
+        
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+# Process-wide indexes, one per embedding model
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_vector_index(model_name: str) -> VectorIndex:
+    with _indexes_lock:
+        if model_name not in _indexes:
+            _indexes[model_name] = VectorIndex(model_name)
+        return _indexes[model_name]
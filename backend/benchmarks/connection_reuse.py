@@ -0,0 +1,61 @@
+"""Benchmark repeated extractions: a session per run vs the shared, pooled session.
+
+Run from backend/:
+
+    python benchmarks/connection_reuse.py [--hosts N] [--runs N] [--latency SECONDS]
+
+Feeds come from the local stand-in server (benchmarks/feed_server.py), so the numbers
+are about connection setup, not the network. Each mode fetches every configured source
+--runs times; "connections" is how many TCP connections the server saw.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from feed_server import FeedServer, local_sources
+from app.services import http_client
+from app.services.news_extractor import NewsExtractor
+
+async def run_mode(shared, args, base_port):
+    async with FeedServer(hosts=args.hosts, base_port=base_port, latency=args.latency) as server:
+        NewsExtractor.NEWS_SOURCES = local_sources(server.urls)
+        if shared:
+            await http_client.start_http_session()
+        try:
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                async with NewsExtractor() as extractor:
+                    articles = await extractor.extract_all_articles(list(NewsExtractor.NEWS_SOURCES))
+                timings.append(time.perf_counter() - started)
+        finally:
+            await http_client.close_http_session()
+        return {
+            "first_run_ms": timings[0] * 1000,
+            "later_runs_ms": sum(timings[1:]) / max(1, len(timings) - 1) * 1000,
+            "connections": server.connections,
+            "requests": server.requests,
+            "articles": len(articles),
+        }
+
+async def main(args):
+    results = {
+        "session per run": await run_mode(False, args, args.base_port),
+        "shared pooled session": await run_mode(True, args, args.base_port + args.hosts),
+    }
+    print(f"{args.hosts} hosts, {args.runs} runs, accept-encoding: {http_client.ACCEPT_ENCODING}\n")
+    print(f"{'mode':<24}{'first run ms':>14}{'later runs ms':>15}{'connections':>13}{'requests':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['first_run_ms']:>14.1f}{r['later_runs_ms']:>15.1f}{r['connections']:>13}{r['requests']:>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added delay per response")
+    parser.add_argument("--base-port", type=int, default=18080)
+    asyncio.run(main(parser.parse_args()))
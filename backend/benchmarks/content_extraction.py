@@ -0,0 +1,109 @@
+"""Benchmark article-content extraction: BeautifulSoup baseline vs the lxml fast path.
+
+Run from backend/:
+
+    python benchmarks/content_extraction.py [--corpus DIR] [--iterations N]
+
+The corpus is every *.html file in DIR (default: benchmarks/fixtures). Files are grouped
+by site using the name before the last underscore (synthetic_main_tag_1.html ->
+synthetic_main_tag), which is what the fast path memoizes selectors by. Each extractor
+runs in a fresh process so peak-memory numbers don't bleed into each other.
+
+The bundled fixtures are synthetic (see benchmarks/README.md); pass --corpus with saved
+real pages to measure actual outlet layouts.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.content_parser import parse_article_html, parse_article_html_soup
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_corpus(corpus_dir):
+    docs = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            docs.append((os.path.basename(path).rsplit("_", 1)[0], f.read()))
+    return docs
+
+def run_soup(docs, iterations):
+    for _ in range(iterations):
+        for _, html in docs:
+            parse_article_html_soup(html)
+
+def run_lxml(docs, iterations):
+    memo = {}
+    for _ in range(iterations):
+        for site, html in docs:
+            _, selector = parse_article_html(html, memo.get(site))
+            if selector:
+                memo[site] = selector
+
+EXTRACTORS = {"bs4 (baseline)": run_soup, "lxml + selector memo": run_lxml}
+
+def measure(name, corpus_dir, iterations, results):
+    docs = load_corpus(corpus_dir)
+    run = EXTRACTORS[name]
+    run(docs, 1)  # warm-up: imports, compiled XPaths, memo
+    
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    run(docs, iterations)
+    elapsed = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    # Python-heap peak for a single pass (libxml2's own allocations show up in RSS only)
+    tracemalloc.start()
+    run(docs, 1)
+    _, peak_heap = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    results[name] = {
+        "docs_per_sec": len(docs) * iterations / elapsed,
+        "rss_growth_kb": peak_rss - baseline_rss,
+        "heap_peak_kb": peak_heap // 1024,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    
+    docs = load_corpus(args.corpus)
+    if not docs:
+        sys.exit(f"No *.html files in {args.corpus}")
+    total_bytes = sum(len(html) for _, html in docs)
+    print(f"Corpus: {len(docs)} documents, {total_bytes / 1024:.0f} KB, {args.iterations} iterations\n")
+    
+    # Same text out of both extractors (the memo may pick a different node only when a
+    # site's layout changes between pages)
+    same = sum(parse_article_html(html)[0] == parse_article_html_soup(html) for _, html in docs)
+    
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        results = manager.dict()
+        for name in EXTRACTORS:
+            process = ctx.Process(target=measure, args=(name, args.corpus, args.iterations, results))
+            process.start()
+            process.join()
+        results = dict(results)
+    
+    print(f"{'extractor':<24}{'docs/sec':>12}{'peak RSS +KB':>15}{'heap peak KB':>15}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['docs_per_sec']:>12.1f}{r['rss_growth_kb']:>15}{r['heap_peak_kb']:>15}")
+    
+    baseline, fast = results["bs4 (baseline)"], results["lxml + selector memo"]
+    print(f"\nSpeed-up: {fast['docs_per_sec'] / baseline['docs_per_sec']:.1f}x")
+    print(f"Identical output: {same}/{len(docs)} documents")
+
+if __name__ == "__main__":
+    main()
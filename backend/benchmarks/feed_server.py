@@ -0,0 +1,131 @@
+"""Local stand-in for the news outlets' RSS feeds, for benchmarks and local development.
+
+Run from backend/:
+
+    python benchmarks/feed_server.py [--hosts N] [--base-port PORT] [--latency SECONDS]
+
+Each "host" is a port on 127.0.0.1 (aiohttp keys its connection pool by host and port),
+serving one RSS feed at /rss.xml. Responses carry an ETag and answer If-None-Match with
+304, and are gzip/brotli compressed when the client accepts it, like the real outlets.
+New TCP connections are counted so callers can check that keep-alive is working.
+
+Point the extractor at it with local_sources(server.urls), which maps every configured
+NEWS_SOURCES feed onto the local hosts.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def build_feed(name, items=30, now=None):
+    """An RSS 2.0 document with `items` entries, newest first"""
+    now = now or datetime.now(timezone.utc)
+    entries = []
+    for i in range(items):
+        published = format_datetime(now - timedelta(minutes=15 * i))
+        entries.append(
+            f"<item><title>{name} story {i}</title>"
+            f"<link>http://example.com/{name}/{i}</link><guid>{name}-{i}</guid>"
+            f"<description>Summary of {name} story {i}. " + "Lorem ipsum dolor sit amet. " * 20 +
+            f"</description><author>desk@{name}.example</author><pubDate>{published}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{name}</title><link>http://example.com/{name}</link>"
+        + "".join(entries) + "</channel></rss>"
+    ).encode()
+
+class FeedServer:
+    """One aiohttp app listening on `hosts` consecutive ports"""
+    
+    def __init__(self, hosts=12, base_port=18080, latency=0.0, items=30):
+        self.hosts = hosts
+        self.base_port = base_port
+        self.latency = latency
+        self.feeds = {port: build_feed(f"host{port}", items) for port in range(base_port, base_port + hosts)}
+        self.requests = 0
+        self.not_modified = 0
+        self._connections = set()
+        self._runner = None
+    
+    @property
+    def urls(self):
+        return [f"http://127.0.0.1:{port}/rss.xml" for port in self.feeds]
+    
+    @property
+    def connections(self):
+        """TCP connections opened by clients so far"""
+        return len(self._connections)
+    
+    async def handle_feed(self, request):
+        self.requests += 1
+        self._connections.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        body = self.feeds[request.url.port]
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        
+        response = web.Response(body=body, content_type="application/rss+xml", headers={"ETag": etag})
+        response.enable_compression()  # Picks br/gzip/deflate from Accept-Encoding
+        return response
+    
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/rss.xml", self.handle_feed)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        for port in self.feeds:
+            await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        return self
+    
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+def local_sources(urls):
+    """NewsExtractor.NEWS_SOURCES with every feed pointed at one of `urls` (round-robin)"""
+    from app.services.news_extractor import NewsExtractor
+    
+    sources = {}
+    i = 0
+    for category, feeds in NewsExtractor.NEWS_SOURCES.items():
+        sources[category] = []
+        for source in feeds:
+            sources[category].append({**source, "rss": urls[i % len(urls)]})
+            i += 1
+    return sources
+
+async def serve(args):
+    server = FeedServer(hosts=args.hosts, base_port=args.base_port, latency=args.latency)
+    async with server:
+        print("Serving feeds:")
+        for url in server.urls:
+            print(f"  {url}")
+        await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hosts", type=int, default=12)
+    parser.add_argument("--base-port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added delay per response")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,49 @@
+import { NextResponse } from "next/server";
+
+// Force dynamic rendering
+export const dynamic = 'force-dynamic';
+export const runtime = 'nodejs';
+
+export async function POST(req: Request) {
+  try {
+    const body = await req.json();
+    const { question, category } = body;
+
+    if (!question) {
+      return NextResponse.json(
+        { error: "Question is required" },
+        { status: 400 }
+      );
+    }
+
+    const backendUrl = process.env.BACKEND_URL || process.env.NEXT_PUBLIC_API_URL?.replace('/api', '') || 'http://localhost:8000';
+    
+    const response = await fetch(`${backendUrl}/api/chat/ask/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ question, category }),
+      signal: req.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      const errorText = await response.text().catch(() => 'Unknown error');
+      throw new Error(`Backend responded with status ${response.status}: ${errorText}`);
+    }
+
+    // Pass the event stream through untouched so tokens reach the browser as they arrive
+    return new Response(response.body, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+      },
+    });
+  } catch (error: any) {
+    return NextResponse.json(
+      { error: error.message || "Failed to process question" },
+      { status: 500 }
+    );
+  }
+}
@@ -9,7 +9,7 @@ import {
   Sparkles,
   MessageSquare
 } from 'lucide-react'
-import { askQuestion, ChatResponse } from '../lib/api'
+import { askQuestionStream } from '../lib/api'
 
 interface ChatbotSectionProps {
   category?: string | null
@@ -58,23 +58,30 @@ export default function ChatbotSection({ category }: ChatbotSectionProps) {
     setInput('')
     setLoading(true)
 
+    const botId = (Date.now() + 1).toString()
+    const updateBot = (update: (message: Message) => Message) =>
+      setMessages((prev) => prev.map((message) => (message.id === botId ? update(message) : message)))
+
     try {
       // Don't restrict by category - let the chatbot search across all categories
-      const response: ChatResponse = await askQuestion(input, undefined)
-      
-      const botMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        type: 'bot',
-        content: response.answer,
-        sources: response.sources,
-        timestamp: new Date(),
-      }
-
-      setMessages((prev) => [...prev, botMessage])
+      // Tokens are appended to the bot message as they stream in
+      await askQuestionStream(input, undefined, {
+        onSources: ({ sources }) => {
+          setMessages((prev) => [
+            ...prev,
+            { id: botId, type: 'bot', content: '', sources, timestamp: new Date() },
+          ])
+        },
+        onToken: (text) => {
+          setLoading(false)
+          updateBot((message) => ({ ...message, content: message.content + text }))
+        },
+      })
     } catch (error) {
       console.error('Error asking question:', error)
+      setMessages((prev) => prev.filter((message) => message.id !== botId))
       const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: (Date.now() + 2).toString(),
         type: 'bot',
         content: 'Sorry, I encountered an error. Please try again or rephrase your question.',
         timestamp: new Date(),
@@ -108,12 +108,55 @@ export interface ChatResponse {
   related_articles: number[]
 }
 
+export interface ExtractionJob {
+  id: number
+  status: 'pending' | 'running' | 'completed' | 'failed'
+  trigger: string
+  categories: string[]
+  message: string | null
+  sources_total: number
+  sources_done: number
+  source_timings: Record<string, { status: string; entries: number; wait_seconds: number; fetch_seconds: number }>
+  articles_extracted: number
+  duplicates_found: number
+  highlights_created: number
+  created_date: string | null
+  started_date: string | null
+  finished_date: string | null
+}
+
+export const getExtractionJob = async (jobId: number): Promise<ExtractionJob> => {
+  const response = await api.get(`/news/jobs/${jobId}`)
+  return response.data
+}
+
 export const extractNews = async (categories: string[] = ['sports', 'lifestyle', 'music', 'finance']) => {
   const response = await api.post('/news/extract', {
     categories,
     force_refresh: false,
   })
-  return response.data
+  const started = response.data
+  if (!started.job_id) {
+    return started
+  }
+
+  // Extraction runs as a background job - poll until it finishes
+  const deadline = Date.now() + 120000
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, 2000))
+    const job = await getExtractionJob(started.job_id)
+    if (job.status === 'completed' || job.status === 'failed') {
+      return {
+        message: job.message,
+        articles_extracted: job.articles_extracted,
+        duplicates_found: job.duplicates_found,
+        highlights_created: job.highlights_created,
+        job_id: job.id,
+        status: job.status,
+      }
+    }
+  }
+  return started
 }
 
 export const getHighlights = async (category?: string | null, limit: number = 50): Promise<Highlight[]> => {
@@ -143,6 +186,67 @@ export const askQuestion = async (question: string, category?: string | null): P
   return response.data
 }
 
+export interface ChatStreamHandlers {
+  onSources?: (data: { sources: string[]; related_articles: number[] }) => void
+  onToken?: (text: string) => void
+}
+
+// Streams the answer over Server-Sent Events; resolves with the full response once done
+export const askQuestionStream = async (
+  question: string,
+  category: string | null | undefined,
+  handlers: ChatStreamHandlers = {}
+): Promise<ChatResponse> => {
+  const response = await fetch(`${API_BASE_URL}/chat/ask/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ question, category: category || undefined }),
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed with status ${response.status}`)
+  }
+
+  const result: ChatResponse = { answer: '', sources: [], related_articles: [] }
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Events are separated by a blank line
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = 'message'
+      let data = ''
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) data += line.slice(6)
+      }
+      const payload = data ? JSON.parse(data) : {}
+
+      if (event === 'sources') {
+        result.sources = payload.sources
+        result.related_articles = payload.related_articles
+        handlers.onSources?.(payload)
+      } else if (event === 'token') {
+        result.answer += payload.text
+        handlers.onToken?.(payload.text)
+      } else if (event === 'done') {
+        result.answer = payload.answer
+      } else if (event === 'error') {
+        throw new Error(payload.detail)
+      }
+    }
+  }
+  return result
+}
+
 export const getChatHistory = async (limit: number = 20) => {
   const response = await api.get('/chat/history', { params: { limit } })
   return response.data